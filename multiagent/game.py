@@ -383,6 +383,12 @@ class GameStateData:
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            # Food features stay valid until Pacman eats (see PacmanRules.consume)
+            self._numFood = prevState._numFood
+            self._nearestFood = prevState._nearestFood
+        else:
+            self._numFood = None
+            self._nearestFood = [{}]
 
         self._foodEaten = None
         self._foodAdded = None
@@ -489,6 +495,8 @@ class GameStateData:
         Creates an initial game state from a layout array (see layout.py).
         """
         self.food = layout.food.copy()
+        self._numFood = self.food.count()
+        self._nearestFood = [{}]
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
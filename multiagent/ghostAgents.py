@@ -43,13 +43,53 @@ class RandomGhost( GhostAgent ):
         return dist
 
 class DirectionalGhost( GhostAgent ):
-    "A ghost that prefers to rush Pacman, or flee when scared."
+    """
+    A ghost that prefers to rush Pacman, or flee when scared.
+
+    A distribution only depends on the ghost's position and direction,
+    Pacman's position, whether the ghost is scared and the walls, so each
+    one is computed once and kept in a table for the current walls.  The
+    table is cleared when it reaches MAX_TABLE_SIZE entries.
+    """
+    MAX_TABLE_SIZE = 100000
+
     def __init__( self, index, prob_attack=0.8, prob_scaredFlee=0.8 ):
         self.index = index
         self.prob_attack = prob_attack
         self.prob_scaredFlee = prob_scaredFlee
+        self.table = {}
+        self.walls = None
 
     def getDistribution( self, state ):
+        dist = util.Counter()
+        for a, prob in self.getDistributionTable( state ): dist[a] = prob
+        return dist
+
+    def getDistributionTable( self, state ):
+        """
+        The distribution as an immutable tuple of (action, probability)
+        pairs, shared by every state with the same key.
+        """
+        if state.isWin() or state.isLose():
+            return ()
+        walls = state.data.layout.walls
+        if walls is not self.walls:
+            # States usually share their layout's walls, so this is rare
+            if self.walls is None or walls != self.walls:
+                self.table = {}
+            self.walls = walls
+        ghostState = state.getGhostState( self.index )
+        conf = ghostState.configuration
+        key = ( conf.pos, conf.direction, state.getPacmanPosition(), ghostState.scaredTimer > 0 )
+        table = self.table.get( key )
+        if table is None:
+            if len( self.table ) >= self.MAX_TABLE_SIZE:
+                self.table = {}
+            table = tuple( self.computeDistribution( state ).items() )
+            self.table[key] = table
+        return table
+
+    def computeDistribution( self, state ):
         # Read variables from state
         ghostState = state.getGhostState( self.index )
         legalActions = state.getLegalActions( self.index )
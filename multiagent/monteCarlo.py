@@ -0,0 +1,205 @@
+# monteCarlo.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Monte Carlo Tree Search for Pacman, used by MonteCarloAgent in
+multiAgents.py.
+
+The tree only branches on Pacman's moves.  Every iteration replays the
+path from the root, sampling each ghost's move from its getDistribution,
+so a node stands for a Pacman move sequence rather than a single state
+(open-loop MCTS).  Its size does not depend on how many ghosts there are.
+Children are chosen by UCT, with values rescaled to [0, 1] by the range
+seen so far.  A new leaf is scored by a rollout: 'depth' rounds of a
+rollout policy for Pacman and sampled ghost moves, then the evaluation
+function.
+
+With several workers every process grows its own tree from the root until
+the deadline (root parallelization), and the root visit counts are summed.
+Workers only exchange the root state and the final counts, so the number
+of rollouts scales with the number of cores.
+"""
+
+import math
+import multiprocessing
+import random
+import time
+
+import ghostAgents
+import util
+from game import Directions
+
+# Rollout policies: (gameState, evaluationFunction) -> Pacman action
+
+def randomRollout(gameState, evaluationFunction):
+    "Any legal move but Stop, uniformly."
+    actions = [a for a in gameState.getLegalActions(0) if a != Directions.STOP]
+    if not actions:
+        return Directions.STOP
+    return random.choice(actions)
+
+def greedyRollout(gameState, evaluationFunction, epsilon=0.2):
+    "The move with the best evaluated successor, or a random one with probability epsilon."
+    if random.random() < epsilon:
+        return randomRollout(gameState, evaluationFunction)
+    actions = [a for a in gameState.getLegalActions(0) if a != Directions.STOP] or [Directions.STOP]
+    scores = [evaluationFunction(gameState.generateSuccessor(0, a)) for a in actions]
+    best = max(scores)
+    return random.choice([a for a, score in zip(actions, scores) if score == best])
+
+ROLLOUT_POLICIES = {'random': randomRollout, 'greedy': greedyRollout}
+
+class MonteCarloNode:
+    __slots__ = ('visits', 'total', 'children')
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.children = {}  # Pacman action -> MonteCarloNode
+
+class MonteCarloSearch:
+    """
+    One search tree.  ghostType is a GhostAgent class from ghostAgents.py,
+    or None for uniformly random ghosts.
+    """
+
+    def __init__(self, evaluationFunction, rolloutPolicy, ghostType, depth, exploration):
+        self.evaluationFunction = evaluationFunction
+        self.rolloutPolicy = rolloutPolicy
+        self.ghostType = ghostType
+        self.ghosts = {}
+        self.depth = depth
+        self.exploration = exploration
+        self.root = MonteCarloNode()
+        self.low, self.high = float('inf'), float('-inf')
+        self.iterations = 0
+
+    def ghostAction(self, gameState, agentIndex):
+        if self.ghostType is not None:
+            if agentIndex not in self.ghosts:
+                self.ghosts[agentIndex] = self.ghostType(agentIndex)
+            distribution = self.ghosts[agentIndex].getDistribution(gameState)
+            if len(distribution) > 0:
+                return util.chooseFromDistribution(distribution)
+        return random.choice(gameState.getLegalActions(agentIndex))
+
+    def advance(self, gameState, action):
+        "Pacman's move followed by a sampled move for every ghost."
+        gameState = gameState.generateSuccessor(0, action)
+        for agentIndex in range(1, gameState.getNumAgents()):
+            if gameState.isWin() or gameState.isLose():
+                break
+            gameState = gameState.generateSuccessor(agentIndex, self.ghostAction(gameState, agentIndex))
+        return gameState
+
+    def rollout(self, gameState):
+        for i in range(self.depth):
+            if gameState.isWin() or gameState.isLose():
+                break
+            gameState = self.advance(gameState, self.rolloutPolicy(gameState, self.evaluationFunction))
+        return self.evaluationFunction(gameState)
+
+    def select(self, node, actions):
+        "UCT over the children for the legal actions, all of which have been visited."
+        spread = self.high - self.low
+        logVisits = math.log(node.visits)
+        best, bestScore = None, float('-inf')
+        for action in actions:
+            child = node.children[action]
+            mean = child.total / child.visits
+            if spread > 0:
+                mean = (mean - self.low) / spread
+            score = mean + self.exploration * math.sqrt(logVisits / child.visits)
+            if score > bestScore:
+                best, bestScore = action, score
+        return best
+
+    def iterate(self, rootState):
+        gameState, node = rootState, self.root
+        path = [node]
+        while not gameState.isWin() and not gameState.isLose():
+            actions = gameState.getLegalActions(0)
+            untried = [a for a in actions if a not in node.children]
+            if untried:
+                action = random.choice(untried)
+                node.children[action] = MonteCarloNode()
+            else:
+                action = self.select(node, actions)
+            gameState = self.advance(gameState, action)
+            node = node.children[action]
+            path.append(node)
+            if untried:
+                break
+        value = self.rollout(gameState)
+        self.low, self.high = min(self.low, value), max(self.high, value)
+        for node in path:
+            node.visits += 1
+            node.total += value
+        self.iterations += 1
+
+    def run(self, rootState, deadline, maxIterations=0):
+        while time.time() < deadline and (maxIterations <= 0 or self.iterations < maxIterations):
+            self.iterate(rootState)
+        return self.rootStatistics()
+
+    def rootStatistics(self):
+        "{action: (visits, total value)} for the root's children."
+        return dict([(action, (child.visits, child.total)) for action, child in self.root.children.items()])
+
+def _getContext():
+    # Forking lets workers inherit evaluation functions and layouts without pickling them
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+def _initWorker():
+    # Workers must never draw on the parent's display
+    import __main__
+    if '_display' in dir(__main__):
+        __main__._display = None
+
+def _monteCarloWorker(rootState, settings, seed, deadline, maxIterations):
+    random.seed(seed)
+    evaluationFunction, rolloutPolicy, ghostName, depth, exploration = settings
+    ghostType = ghostName and getattr(ghostAgents, ghostName) or None
+    search = MonteCarloSearch(evaluationFunction, rolloutPolicy, ghostType, depth, exploration)
+    return search.run(rootState, deadline, maxIterations), search.iterations
+
+class MonteCarloPool:
+    "A pool of processes that each grow an independent tree from the same root."
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = _getContext().Pool(workers, initializer=_initWorker)
+
+    def search(self, rootState, settings, deadline, maxIterations=0):
+        """
+        Returns the summed root statistics of every worker and the total
+        number of iterations.
+        """
+        tasks = [self.pool.apply_async(_monteCarloWorker,
+                                       (rootState, settings, random.getrandbits(32), deadline, maxIterations))
+                 for i in range(self.workers)]
+        statistics, iterations = {}, 0
+        for task in tasks:
+            workerStatistics, workerIterations = task.get()
+            iterations += workerIterations
+            for action, (visits, total) in workerStatistics.items():
+                oldVisits, oldTotal = statistics.get(action, (0, 0.0))
+                statistics[action] = (oldVisits + visits, oldTotal + total)
+        return statistics, iterations
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
@@ -12,9 +12,13 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
-from util import manhattanDistance
 from game import Directions
-import random, util
+import random, util, time, os
+import ghostAgents
+import monteCarlo
+import pondering
+import tablebase
+import openingBook
 
 from game import Agent
 
@@ -58,8 +62,6 @@ class ReflexAgent(Agent):
       """
       # Generate the successor state after applying the action
       successorGameState = currentGameState.generatePacmanSuccessor(action)
-      newPos = successorGameState.getPacmanPosition()  # New position of Pacman
-      newFood = successorGameState.getFood()  # Remaining food
       newGhostStates = successorGameState.getGhostStates()  # Current state of the ghosts
       newScaredTimes = [ghostState.scaredTimer for ghostState in newGhostStates]  # Scared timers for ghosts
 
@@ -67,15 +69,12 @@ class ReflexAgent(Agent):
       score = successorGameState.getScore()
 
       # Consider the distance to the nearest food
-      foodDistances = [manhattanDistance(newPos, food) for food in newFood.asList()]
-      if foodDistances:
-          score += 10 / min(foodDistances)  # Favor closer food by increasing score
+      nearestFoodDist = successorGameState.getNearestFoodDistance()
+      if nearestFoodDist is not None:
+          score += 10 / nearestFoodDist  # Favor closer food by increasing score
 
       # Factor in ghost positions and whether they are scared or not
-      for i, ghostState in enumerate(newGhostStates):
-          ghostPos = ghostState.getPosition()
-          ghostDistance = manhattanDistance(newPos, ghostPos)
-
+      for i, ghostDistance in enumerate(successorGameState.getGhostDistances()):
           if newScaredTimes[i] > 0:
               # If the ghost is scared, Pacman is encouraged to approach it
               if ghostDistance > 0:
@@ -116,22 +115,145 @@ class MultiAgentSearchAgent(Agent):
       is another abstract class.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', batchSize = '0'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        # With batchSize > 0, the tree is built in memory first and its leaves
+        # are evaluated batchSize at a time.  This is opt-in: each batch maps
+        # the evaluation function over its states, so it is no faster than
+        # evaluating them one at a time
+        self.batchSize = int(batchSize)
+        self.batchEvaluationFunction = None
+        if self.batchSize > 0:
+            self.batchEvaluationFunction = self.evaluateBatch
+
+    def evaluateBatch(self, gameStates):
+        "self.evaluationFunction for a list of states."
+        return [self.evaluationFunction(gameState) for gameState in gameStates]
+
+    def expandTree(self, gameState, depth, agentIndex, leaves):
+        """
+        Expands the game tree below gameState, in the same order as minimax,
+        and hands each leaf state to leaves (a LeafBatch).  Returns the index
+        of the leaf's value, or (agentIndex, [(action, subtree)]) for an
+        inner node.
+        """
+        if depth == self.depth or gameState.isWin() or gameState.isLose():
+            return leaves.add(gameState)
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        nextDepth = depth + (nextAgent == 0 and 1 or 0)
+        return (agentIndex, [(action, self.expandTree(gameState.generateSuccessor(agentIndex, action),
+                                                      nextDepth, nextAgent, leaves))
+                             for action in gameState.getLegalActions(agentIndex)])
+
+    def backUp(self, tree, values, expectation=False):
+        """
+        Returns (value, action) for an expanded tree once its leaf values are
+        known.  Ghosts minimize, or are averaged over when expectation is set.
+        """
+        if not isinstance(tree, tuple):
+            return values[tree], None
+        agentIndex, children = tree
+        if agentIndex == 0:
+            bestValue, bestAction = float('-inf'), None
+            for action, subtree in children:
+                value = self.backUp(subtree, values, expectation)[0]
+                if value > bestValue:
+                    bestValue, bestAction = value, action
+            return bestValue, bestAction
+        if expectation:
+            total = 0
+            for action, subtree in children:
+                total += self.backUp(subtree, values, expectation)[0]
+            return (children and total / len(children) or 0), None
+        bestValue = float('inf')
+        for action, subtree in children:
+            bestValue = min(bestValue, self.backUp(subtree, values, expectation)[0])
+        return bestValue, None
+
+    def batchedSearch(self, gameState, expectation=False):
+        "Minimax, or expectimax, with leaves evaluated in batches.  Returns (value, action)."
+        leaves = LeafBatch(self.batchEvaluationFunction, self.batchSize)
+        tree = self.expandTree(gameState, 0, 0, leaves)
+        return self.backUp(tree, leaves.finish(), expectation)
+
+class LeafBatch:
+    """
+    Collects leaf states and evaluates them batchSize at a time with a
+    batched evaluation function, which maps a list of states to a list of
+    values.  Evaluated states are dropped, so at most batchSize of them are
+    held at once.
+    """
+    def __init__(self, batchEvaluationFunction, batchSize):
+        self.batchEvaluationFunction = batchEvaluationFunction
+        self.batchSize = batchSize
+        self.values = []
+        self.pending = []
+
+    def add(self, gameState):
+        "Queues a state and returns the index its value will have."
+        self.pending.append(gameState)
+        index = len(self.values) + len(self.pending) - 1
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+        return index
+
+    def flush(self):
+        if self.pending:
+            self.values.extend(self.batchEvaluationFunction(self.pending))
+            self.pending = []
+
+    def finish(self):
+        "Evaluates whatever is left and returns every value, by index."
+        self.flush()
+        return self.values
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
     Minimax agent for adversarial search in Pacman.
+
+    With many ghosts the tree grows as (ghost moves)^(ghosts * depth), so
+    the ghost layers can be reduced:
+
+      ghostMode=joint  all modeled ghosts reply in a single min layer.
+                       Replies that leave the ghosts in the same places (in
+                       any order) are searched once, and while no ghost is
+                       scared, a reply that leaves every ghost at least as
+                       far from Pacman as one already searched is skipped.
+                       Both assume the evaluation function treats ghosts
+                       alike and prefers them further away, as the ones in
+                       this file do; the second is exact at the leaves and a
+                       heuristic above them.
+      ghostRadius=r    ghosts further than r steps through the maze at the
+                       start of the search stay where they are
+      maxGhosts=k      only the k ghosts nearest through the maze move
+
+    For example: -p MinimaxAgent -a depth=3,ghostMode=joint,maxGhosts=2 -k 4
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', batchSize = '0',
+                 ghostMode = 'sequential', ghostRadius = '0', maxGhosts = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, batchSize)
+        if ghostMode not in ('sequential', 'joint'):
+            raise Exception('Unknown ghost mode: ' + ghostMode)
+        self.ghostMode = ghostMode
+        self.ghostRadius = int(ghostRadius)
+        self.maxGhosts = int(maxGhosts)
+
     def getAction(self, gameState):
         """
         Returns the best action according to the minimax algorithm.
         Uses self.depth to determine the search depth, and self.evaluationFunction 
         to evaluate game states at the leaves.
         """
+        ghosts = self.modeledGhosts(gameState)
+        if self.ghostMode == 'joint' or len(ghosts) < gameState.getNumAgents() - 1:
+            self.ghosts = ghosts
+            self.duplicates = self.dominated = 0  # joint replies skipped, for tuning
+            return self.reducedMaxValue(gameState, 0)[1]
+        if self.batchEvaluationFunction is not None:
+            return self.batchedSearch(gameState)[1]
         # Start minimax from Pacman (agentIndex = 0)
         return self.minimax(gameState, 0, 0)[1]
 
@@ -201,17 +323,256 @@ class MinimaxAgent(MultiAgentSearchAgent):
 
         return min_score, best_action
 
+    def modeledGhosts(self, gameState):
+        "The indices of the ghosts that move in the search, nearest first."
+        ghosts = list(range(1, gameState.getNumAgents()))
+        if self.ghostRadius <= 0 and self.maxGhosts <= 0:
+            return ghosts
+        distances = mazeDistances(gameState.getPacmanPosition(), gameState.getWalls())
+        far = float('inf')
+        ghostDistance = dict([(ghost, distances.get(util.nearestPoint(gameState.getGhostPosition(ghost)), far))
+                              for ghost in ghosts])
+        ghosts.sort(key=lambda ghost: ghostDistance[ghost])
+        if self.ghostRadius > 0:
+            ghosts = [ghost for ghost in ghosts if ghostDistance[ghost] <= self.ghostRadius]
+        if self.maxGhosts > 0:
+            ghosts = ghosts[:self.maxGhosts]
+        return ghosts
+
+    def reducedMaxValue(self, gameState, depth):
+        "Pacman's move when only self.ghosts reply.  Returns (value, action)."
+        if depth == self.depth or gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState), None
+        bestValue, bestAction = float('-inf'), None
+        for action in gameState.getLegalActions(0):
+            successor = gameState.generateSuccessor(0, action)
+            if self.ghostMode == 'joint':
+                value = self.jointMinValue(successor, depth)
+            else:
+                value = self.sequentialMinValue(successor, depth, 0)
+            if value > bestValue:
+                bestValue, bestAction = value, action
+        return bestValue, bestAction
+
+    def sequentialMinValue(self, gameState, depth, k):
+        "The reply of the k-th modeled ghost and the ones after it, one ply each."
+        if k == len(self.ghosts) or gameState.isWin() or gameState.isLose():
+            return self.reducedMaxValue(gameState, depth + 1)[0]
+        ghost = self.ghosts[k]
+        return min([self.sequentialMinValue(gameState.generateSuccessor(ghost, action), depth, k + 1)
+                    for action in gameState.getLegalActions(ghost)] or [float('inf')])
+
+    def jointMinValue(self, gameState, depth):
+        "Every modeled ghost replies at once; the ghosts minimize over the combined replies."
+        outcomes = [gameState]
+        for ghost in self.ghosts:
+            nextOutcomes = []
+            for outcome in outcomes:
+                if outcome.isWin() or outcome.isLose():
+                    nextOutcomes.append(outcome)
+                    continue
+                for action in outcome.getLegalActions(ghost):
+                    nextOutcomes.append(outcome.generateSuccessor(ghost, action))
+            outcomes = nextOutcomes
+
+        # Losses first, then the replies that bring the ghosts nearest, so
+        # the replies that dominate others are searched before them
+        ghostDistances = [sorted(outcome.getGhostDistances()) for outcome in outcomes]
+        order = sorted(range(len(outcomes)),
+                       key=lambda i: (not outcomes[i].isLose(), sum(ghostDistances[i])))
+        seen = set()
+        searched = []  # (score, sorted ghost distances) of the replies searched
+        bestValue = float('inf')
+        for i in order:
+            outcome = outcomes[i]
+            ghostStates = outcome.data.agentStates[1:]
+            # Outcomes that differ only in which ghost is where are the same
+            # to Pacman, so only one of each is searched
+            key = (outcome.isLose(), outcome.getScore(),
+                   tuple(sorted([(g.getPosition(), g.getDirection(), g.scaredTimer) for g in ghostStates])))
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            # Ghost moves leave the food alone, so with the same score only
+            # the ghosts differ; further from Pacman is no better for them
+            canDominate = not outcome.isWin() and not outcome.isLose() and \
+                          not any([g.scaredTimer > 0 for g in ghostStates])
+            if canDominate:
+                score, distances = outcome.getScore(), ghostDistances[i]
+                if any([score == otherScore and all([d >= e for d, e in zip(distances, otherDistances)])
+                        for otherScore, otherDistances in searched]):
+                    self.dominated += 1
+                    continue
+                searched.append((score, distances))
+            bestValue = min(bestValue, self.reducedMaxValue(outcome, depth + 1)[0])
+        return bestValue
+
+def mazeDistances(source, walls):
+    "Breadth-first step counts from source to every open cell."
+    source = util.nearestPoint(source)
+    distances = {source: 0}
+    frontier = [source]
+    while frontier:
+        nextFrontier = []
+        for x, y in frontier:
+            for nextCell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if nextCell not in distances and not walls[nextCell[0]][nextCell[1]]:
+                    distances[nextCell] = distances[(x, y)] + 1
+                    nextFrontier.append(nextCell)
+        frontier = nextFrontier
+    return distances
+
+MOVE_ORDERINGS = ('pv', 'killer', 'history', 'eval')
+
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
-      Your minimax agent with alpha-beta pruning (question 3)
+    Minimax agent with alpha-beta pruning (question 3).
+
+    By default moves are searched in getLegalActions order, which is what the
+    autograder expects.  'ordering' switches on any of these move orderings,
+    joined with '+' (or 'all').  They only change which moves are tried
+    first, so they prune more of the tree without changing the value:
+
+      pv      - the principal variation left over from the previous turn
+      killer  - the last two moves that caused a cutoff at the same ply
+      history - moves that caused cutoffs anywhere, weighted by the depth
+                below them and kept (decaying) across turns
+      eval    - children sorted by self.evaluationFunction, best first
+
+    For example: -p AlphaBetaAgent -a depth=4,ordering=all
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', ordering = 'none'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth)
+        if ordering == 'all':
+            self.orderings = MOVE_ORDERINGS
+        elif ordering == 'none':
+            self.orderings = ()
+        else:
+            self.orderings = tuple(ordering.split('+'))
+            for name in self.orderings:
+                if name not in MOVE_ORDERINGS:
+                    raise Exception('Unknown move ordering: ' + name)
+        self.history = util.Counter()
+        self.principalVariation = []
+        self.generated = 0
+
+    def registerInitialState(self, gameState):
+        self.history = util.Counter()
+        self.principalVariation = []
+
     def getAction(self, gameState):
         """
           Returns the minimax action using self.depth and self.evaluationFunction
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        self.numAgents = gameState.getNumAgents()
+        self.plies = self.depth * self.numAgents
+        self.killers = {}
+        self.generated = 0
+        for key in list(self.history.keys()):
+            self.history[key] //= 2
+
+        # After a full round the rest of last turn's line starts at our move again
+        previous = []
+        if 'pv' in self.orderings:
+            previous = self.principalVariation[self.numAgents:]
+        value, line = self.alphaBeta(gameState, 0, float('-inf'), float('inf'), previous)
+        self.principalVariation = line
+        if not line:
+            return Directions.STOP
+        return line[0]
+
+    def alphaBeta(self, gameState, ply, alpha, beta, pv):
+        """
+        Returns (value, line) for the subtree below gameState, where line is
+        the principal variation: the actions of every agent along the best
+        play found.  pv is the expected line, if this node lies on it.
+        """
+        if ply == self.plies or gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState), []
+
+        agentIndex = ply % self.numAgents
+        maximizing = agentIndex == 0
+        if maximizing:
+            bestValue = float('-inf')
+        else:
+            bestValue = float('inf')
+        bestLine = []
+        pvMove = pv and pv[0] or None
+
+        for action, successor in self.orderMoves(gameState, agentIndex, ply, pvMove):
+            if successor is None:
+                successor = gameState.generateSuccessor(agentIndex, action)
+                self.generated += 1
+            if action == pvMove:
+                childPV = pv[1:]
+            else:
+                childPV = []
+            value, line = self.alphaBeta(successor, ply + 1, alpha, beta, childPV)
+
+            if maximizing:
+                if value > bestValue:
+                    bestValue, bestLine = value, [action] + line
+                if bestValue > beta:
+                    self.recordCutoff(gameState, agentIndex, ply, action)
+                    return bestValue, bestLine
+                alpha = max(alpha, bestValue)
+            else:
+                if value < bestValue:
+                    bestValue, bestLine = value, [action] + line
+                if bestValue < alpha:
+                    self.recordCutoff(gameState, agentIndex, ply, action)
+                    return bestValue, bestLine
+                beta = min(beta, bestValue)
+
+        return bestValue, bestLine
+
+    def orderMoves(self, gameState, agentIndex, ply, pvMove):
+        """
+        Returns (action, successor) pairs in the order to search them.  The
+        successor is None unless eval ordering had to generate it already.
+        """
+        actions = gameState.getLegalActions(agentIndex)
+        if not self.orderings:
+            return [(action, None) for action in actions]
+
+        successors = dict([(action, None) for action in actions])
+        scores = {}
+        # Generating every child only pays off with at least a full round below it
+        if 'eval' in self.orderings and ply + self.numAgents < self.plies:
+            sign = agentIndex == 0 and -1 or 1
+            for action in actions:
+                successors[action] = gameState.generateSuccessor(agentIndex, action)
+                self.generated += 1
+                scores[action] = sign * self.evaluationFunction(successors[action])
+
+        killers = 'killer' in self.orderings and self.killers.get(ply, ()) or ()
+        useHistory = 'history' in self.orderings
+
+        def priority(action):
+            return (action != pvMove,
+                    action not in killers,
+                    useHistory and -self.history[_moveKey(gameState, agentIndex, action)] or 0,
+                    scores.get(action, 0))
+
+        return [(action, successors[action]) for action in sorted(actions, key=priority)]
+
+    def recordCutoff(self, gameState, agentIndex, ply, action):
+        "Remembers a move that caused a cutoff as a killer and in the history table."
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        remaining = self.plies - ply
+        self.history[_moveKey(gameState, agentIndex, action)] += remaining * remaining
+
+def _moveKey(gameState, agentIndex, action):
+    "Identifies a move by who makes it, from where, and in which direction."
+    data = getattr(gameState, 'data', None)
+    if data is None:
+        return (agentIndex, action)
+    return (agentIndex, data.agentStates[agentIndex].getPosition(), action)
 
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
@@ -222,6 +583,8 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         """
         Chooses the best action for Pacman based on the expectimax algorithm.
         """
+        if self.batchEvaluationFunction is not None:
+            return self.batchedSearch(gameState, expectation=True)[1]
         # Start the expectimax search with Pacman as the first agent
         return self.expectimax(gameState, 0, 0)[1]
 
@@ -281,6 +644,365 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         expected_score = total_score / len(actions) if actions else 0
         return expected_score, None
 
+class StarExpectimaxAgent(ExpectimaxAgent):
+    """
+    Expectimax with Star1 and Star2 pruning at the ghosts' chance nodes
+    (Ballard, 1983), against uniform or modeled ghosts.
+
+    Chance nodes can only be cut off when the evaluation function is known to
+    lie within [lower, upper].  Once some ghost moves have been searched, the
+    expectation is bracketed by assuming every remaining move scores lower,
+    or upper.  Star1 cuts a chance node off as soon as the bracket falls
+    outside the alpha-beta window, and narrows the window passed to each
+    child to match.  Star2 (probe=True) first searches only one Pacman move
+    below each outcome of the last ghost, which cheaply raises the lower end
+    of the bracket and often cuts the node off before any full search.
+
+    Leaf values are clamped to [lower, upper], so the result is exact for
+    evaluation functions that respect the declared bounds.  With the default
+    infinite bounds nothing is pruned at chance nodes.
+
+    'ghost' is 'uniform', which matches ExpectimaxAgent, or the name of a
+    ghost agent in ghostAgents.py whose getDistribution gives the odds of
+    each ghost move, such as DirectionalGhost.  For example:
+
+      -p StarExpectimaxAgent -a depth=3,evalFn=better,lower=-1000,upper=3000,ghost=DirectionalGhost
+    """
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', lower = '-inf', upper = 'inf',
+                 ghost = 'uniform', probe = 'True'):
+        ExpectimaxAgent.__init__(self, evalFn, depth)
+        self.lower, self.upper = float(lower), float(upper)
+        if self.lower > self.upper:
+            raise Exception('Evaluation bounds are empty: [%s, %s]' % (lower, upper))
+        self.bounded = self.lower > float('-inf') and self.upper < float('inf')
+        self.ghostType = None
+        if ghost != 'uniform':
+            self.ghostType = getattr(ghostAgents, ghost)
+        self.ghosts = {}
+        self.probe = probe == 'True' or probe is True
+        self.generated = 0
+
+    def getAction(self, gameState):
+        self.numAgents = gameState.getNumAgents()
+        self.plies = self.depth * self.numAgents
+        self.generated = 0
+        return self.maxValue(gameState, 0, self.lower, self.upper)[1]
+
+    def successor(self, gameState, agentIndex, action):
+        self.generated += 1
+        return gameState.generateSuccessor(agentIndex, action)
+
+    def value(self, gameState, ply, alpha, beta):
+        if ply == self.plies or gameState.isWin() or gameState.isLose():
+            return min(max(self.evaluationFunction(gameState), self.lower), self.upper)
+        if ply % self.numAgents == 0:
+            return self.maxValue(gameState, ply, alpha, beta)[0]
+        return self.chanceValue(gameState, ply, alpha, beta)
+
+    def maxValue(self, gameState, ply, alpha, beta, probe=False, probed=None):
+        """
+        Returns (value, action) for Pacman, with fail-soft alpha-beta pruning.
+        A probe only tries the first legal action, so it returns a lower
+        bound on the node's value.  'probed' is the value a probe already
+        found for the first action, which is then not searched again.
+        """
+        bestValue, bestAction = float('-inf'), None
+        actions = gameState.getLegalActions(0)
+        if probe:
+            actions = actions[:1]
+        elif probed is not None:
+            bestValue, bestAction = probed, actions[0]
+            actions = actions[1:]
+        for action in actions:
+            if bestValue >= beta:
+                break
+            value = self.value(self.successor(gameState, 0, action), ply + 1, max(alpha, bestValue), beta)
+            if value > bestValue:
+                bestValue, bestAction = value, action
+        return bestValue, bestAction
+
+    def distribution(self, gameState, agentIndex):
+        "The ghost's moves as (probability, action) pairs, most likely first."
+        return pondering.ghostOutcomes(gameState, agentIndex, self.ghostType, self.ghosts)
+
+    def chanceValue(self, gameState, ply, alpha, beta):
+        agentIndex = ply % self.numAgents
+        outcomes = self.distribution(gameState, agentIndex)
+        if not self.bounded:
+            # Without bounds a window says nothing about the average, so search exactly
+            return sum([p * self.value(self.successor(gameState, agentIndex, action), ply + 1,
+                                       float('-inf'), float('inf')) for p, action in outcomes])
+
+        lower, upper = self.lower, self.upper
+        successors = [None] * len(outcomes)
+        # lowSum and highSum bracket the expectation: searched outcomes count
+        # their value, the rest their lower bound or upper respectively
+        lows = [lower] * len(outcomes)
+        probed = [None] * len(outcomes)
+        lowSum, highSum = lower, upper
+
+        if self.probe and (ply + 1) % self.numAgents == 0 and ply + 1 < self.plies:
+            for i, (p, action) in enumerate(outcomes):
+                successor = successors[i] = self.successor(gameState, agentIndex, action)
+                if successor.isWin() or successor.isLose():
+                    continue
+                # With alpha at the lower bound a probe cannot fail low, and
+                # failing high cuts this node off, so otherwise it is exact
+                probeBeta = min(upper, (beta - (lowSum - p * lows[i])) / p)
+                bound = self.maxValue(successor, ply + 1, lower, probeBeta, probe=True)[0]
+                lowSum += p * (bound - lows[i])
+                lows[i] = probed[i] = bound
+                if lowSum >= beta:
+                    return lowSum
+
+        for i, (p, action) in enumerate(outcomes):
+            childAlpha = max(lower, (alpha - (highSum - p * upper)) / p)
+            childBeta = min(upper, (beta - (lowSum - p * lows[i])) / p)
+            if successors[i] is None:
+                successors[i] = self.successor(gameState, agentIndex, action)
+            if probed[i] is None:
+                value = self.value(successors[i], ply + 1, childAlpha, childBeta)
+            else:
+                value = self.maxValue(successors[i], ply + 1, childAlpha, childBeta, probed=probed[i])[0]
+            lowSum += p * (value - lows[i])
+            highSum += p * (value - upper)
+            if highSum <= alpha:
+                return highSum
+            if lowSum >= beta:
+                return lowSum
+        return lowSum
+
+
+class MonteCarloAgent(MultiAgentSearchAgent):
+    """
+    Monte Carlo Tree Search (UCT) over Pacman's moves, with ghost moves
+    sampled from the getDistribution of 'ghost' (a ghost agent in
+    ghostAgents.py, or 'uniform').  See monteCarlo.py.
+
+      depth:       rounds per rollout before the evaluation function is applied
+      timeLimit:   seconds to think per move
+      iterations:  stop early after this many iterations per worker (0: no cap)
+      exploration: the UCT exploration constant, for values scaled to [0, 1]
+      rollout:     'random', 'greedy' or the name of a function
+                   (gameState, evaluationFunction) -> action
+      workers:     processes growing independent trees; 1 searches in-process
+
+    For example: -p MonteCarloAgent -a timeLimit=0.5,workers=4,evalFn=better
+    """
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '3', timeLimit = '0.5', iterations = '0',
+                 exploration = '1.0', rollout = 'greedy', ghost = 'DirectionalGhost', workers = '1'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth)
+        self.timeLimit = float(timeLimit)
+        self.iterations = int(iterations)
+        self.exploration = float(exploration)
+        if rollout in monteCarlo.ROLLOUT_POLICIES:
+            self.rolloutPolicy = monteCarlo.ROLLOUT_POLICIES[rollout]
+        else:
+            self.rolloutPolicy = util.lookup(rollout, globals())
+        self.ghostName = ghost != 'uniform' and ghost or None
+        self.workers = int(workers)
+        self.pool = None
+        self.lastIterations = 0
+
+    def getAction(self, gameState):
+        deadline = time.time() + self.timeLimit
+        if self.workers > 1:
+            if self.pool is None:
+                self.pool = monteCarlo.MonteCarloPool(self.workers)
+            settings = (self.evaluationFunction, self.rolloutPolicy, self.ghostName, self.depth, self.exploration)
+            statistics, self.lastIterations = self.pool.search(gameState, settings, deadline, self.iterations)
+        else:
+            ghostType = self.ghostName and getattr(ghostAgents, self.ghostName) or None
+            search = monteCarlo.MonteCarloSearch(self.evaluationFunction, self.rolloutPolicy, ghostType,
+                                                 self.depth, self.exploration)
+            statistics = search.run(gameState, deadline, self.iterations)
+            self.lastIterations = search.iterations
+        if not statistics:
+            return Directions.STOP
+        # The most visited move is the most robust choice
+        return max(statistics, key=lambda action: (statistics[action][0], statistics[action][1]))
+
+    def final(self, gameState):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+class PonderingAgent(Agent):
+    """
+    Plays like the search agent 'agent', but keeps searching while the
+    ghosts move.  After each move, the 'predictions' most likely positions
+    at Pacman's next turn are searched in the background (see pondering.py)
+    and a correct prediction is answered without searching again.
+
+      mode:  'thread', or 'process' to search every prediction in parallel
+      ghost: 'uniform', or the ghost agent in ghostAgents.py whose
+             getDistribution ranks the predictions
+
+    Any other options are passed on to the search agent.  For example:
+
+      -p PonderingAgent -a agent=AlphaBetaAgent,depth=3,evalFn=better,mode=process
+    """
+
+    def __init__(self, agent = 'AlphaBetaAgent', mode = 'thread', predictions = '4', ghost = 'uniform', **args):
+        self.index = 0
+        self.agent = util.lookup(agent, globals())(**args)
+        if mode not in pondering.PONDERERS:
+            raise Exception('Unknown pondering mode: ' + mode)
+        self.ponderer = pondering.PONDERERS[mode]()
+        self.predictions = int(predictions)
+        self.ghostType = None
+        if ghost != 'uniform':
+            self.ghostType = getattr(ghostAgents, ghost)
+        self.ghosts = {}
+        self.hits = self.misses = 0
+
+    def registerInitialState(self, gameState):
+        if hasattr(self.agent, 'registerInitialState'):
+            self.agent.registerInitialState(gameState)
+
+    def getAction(self, gameState):
+        found, action = self.ponderer.take(gameState)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+            action = self.agent.getAction(gameState)
+        predicted = pondering.predictPositions(gameState, action, self.predictions, self.ghostType, self.ghosts)
+        self.ponderer.start(self.agent, [state for p, state in predicted])
+        return action
+
+    def final(self, gameState):
+        self.ponderer.cancel()
+        if hasattr(self.agent, 'final'):
+            self.agent.final(gameState)
+
+class TablebaseAgent(Agent):
+    """
+    Plays perfectly from a solved table of the layout (see tablebase.py),
+    and falls back on the search agent 'agent' for any state the table does
+    not cover.
+
+      table: the table file; it is built for the game's layout and saved
+             there if it does not exist yet.  Without one the table is built
+             in memory at the start of the game.
+      mode:  'minimax' or 'expectimax', for tables built here
+      ghost: 'uniform', or the expectimax ghost model for tables built here
+      maxStates: the most states a table built here may have; on larger
+             layouts the search agent plays the whole game
+
+    Other options are passed on to the search agent.  For example:
+
+      python tablebase.py -l testClassic -m expectimax -o testClassic.tb
+      python pacman.py -l testClassic -p TablebaseAgent -a table=testClassic.tb
+    """
+
+    def __init__(self, table = '', mode = 'minimax', ghost = 'uniform', maxStates = '1000000',
+                 agent = 'AlphaBetaAgent', **args):
+        self.index = 0
+        self.tableFile = table
+        self.mode = mode
+        self.ghost = ghost
+        self.maxStates = int(maxStates)
+        self.table = None
+        self.tooLarge = None  # the last layout with more than maxStates states
+        self.agent = util.lookup(agent, globals())(**args)
+        self.lookups = self.searches = 0
+
+    def registerInitialState(self, gameState):
+        if self.table is None or not self.table.covers(gameState):
+            if self.tableFile and os.path.exists(self.tableFile):
+                self.table = tablebase.loadTablebase(self.tableFile)
+            elif gameState.data.layout.layoutText == self.tooLarge:
+                self.table = None
+            else:
+                builder = tablebase.TablebaseBuilder(gameState.data.layout, self.mode, self.ghost,
+                                                     gameState.getNumAgents() - 1, self.maxStates)
+                try:
+                    self.table = builder.build(gameState)
+                except tablebase.TooManyStates:
+                    self.table = None
+                    self.tooLarge = gameState.data.layout.layoutText
+                    tablebase.resetExplored(gameState)
+                if self.table is not None and self.tableFile:
+                    self.table.save(self.tableFile)
+        if hasattr(self.agent, 'registerInitialState'):
+            self.agent.registerInitialState(gameState)
+
+    def getAction(self, gameState):
+        values = None
+        if self.table is not None and self.table.covers(gameState):
+            values = self.table.actionValues(gameState)
+        if values is None:
+            self.searches += 1
+            return self.agent.getAction(gameState)
+        self.lookups += 1
+        bestValue = max(values.values())
+        return [action for action in gameState.getLegalActions(0) if values[action] == bestValue][0]
+
+    def final(self, gameState):
+        if hasattr(self.agent, 'final'):
+            self.agent.final(gameState)
+
+class OpeningBookAgent(Agent):
+    """
+    Plays the first moves of a game from an opening book of the layout (see
+    openingBook.py), and the rest with the search agent 'agent'.
+
+      book:      the book file; it is built for the game's layout and saved
+                 there if it does not exist yet.  Without one the book is
+                 built in memory at the start of the first game.
+      plies:     how many of Pacman's moves books built here cover
+      bookDepth: the search depth for books built here (0: the agent's own)
+
+    Other options are passed on to the search agent.  For example:
+
+      python openingBook.py -l smallClassic -n 4 -a depth=6,evalFn=better -o smallClassic.book
+      python pacman.py -l smallClassic -p OpeningBookAgent -a book=smallClassic.book,depth=3,evalFn=better -n 1000 -q
+    """
+
+    def __init__(self, book = '', plies = '3', bookDepth = '0', agent = 'AlphaBetaAgent', **args):
+        self.index = 0
+        self.bookFile = book
+        self.plies = int(plies)
+        self.agentType = util.lookup(agent, globals())
+        self.agentArgs = args
+        self.agent = self.agentType(**args)
+        self.bookDepth = int(bookDepth)
+        self.book = None
+        self.lookups = self.searches = 0
+
+    def registerInitialState(self, gameState):
+        if self.book is None or not self.book.covers(gameState):
+            if self.bookFile and os.path.exists(self.bookFile):
+                self.book = openingBook.loadOpeningBook(self.bookFile)
+            else:
+                searcher = self.agent
+                if self.bookDepth > 0:
+                    args = dict(self.agentArgs)
+                    args['depth'] = self.bookDepth
+                    searcher = self.agentType(**args)
+                self.book = openingBook.buildOpeningBook(gameState, searcher, self.plies)
+                if self.bookFile:
+                    self.book.save(self.bookFile)
+        if hasattr(self.agent, 'registerInitialState'):
+            self.agent.registerInitialState(gameState)
+
+    def getAction(self, gameState):
+        action = None
+        if self.book is not None and self.book.covers(gameState):
+            action = self.book.lookup(gameState)
+        if action is None:
+            self.searches += 1
+            return self.agent.getAction(gameState)
+        self.lookups += 1
+        return action
+
+    def final(self, gameState):
+        if hasattr(self.agent, 'final'):
+            self.agent.final(gameState)
+
 
 def betterEvaluationFunction(currentGameState):
     """
@@ -291,26 +1013,20 @@ def betterEvaluationFunction(currentGameState):
     - Remaining food dots
     """
 
-    # Get Pacman's position and relevant state details
-    pacmanPos = currentGameState.getPacmanPosition()
-    foodGrid = currentGameState.getFood()
+    # The food, ghost and capsule features are kept up to date by the GameState,
+    # so this costs O(ghosts) rather than a scan of the food grid
     ghostStates = currentGameState.getGhostStates()
-    capsules = currentGameState.getCapsules()
 
     # Start with the base score for the current state
     score = currentGameState.getScore()
 
     # Distance to the closest food
-    foodList = foodGrid.asList()
-    if foodList:
-        nearestFoodDist = min([manhattanDistance(pacmanPos, food) for food in foodList])
+    nearestFoodDist = currentGameState.getNearestFoodDistance()
+    if nearestFoodDist is not None:
         score += 10 / nearestFoodDist  # Inverse distance to prioritize closer food
 
     # Adjust score based on ghost distances
-    for ghost in ghostStates:
-        ghostPos = ghost.getPosition()
-        distToGhost = manhattanDistance(pacmanPos, ghostPos)
-
+    for ghost, distToGhost in zip(ghostStates, currentGameState.getGhostDistances()):
         if ghost.scaredTimer > 0:
             # Encourage getting closer to scared ghosts
             score += 200 / distToGhost if distToGhost > 0 else 200
@@ -320,12 +1036,12 @@ def betterEvaluationFunction(currentGameState):
                 score -= 10 / distToGhost
 
     # Encourage collecting capsules if there are active ghosts
-    if capsules and any(ghost.scaredTimer == 0 for ghost in ghostStates):
-        nearestCapsuleDist = min([manhattanDistance(pacmanPos, cap) for cap in capsules])
+    nearestCapsuleDist = currentGameState.getNearestCapsuleDistance()
+    if nearestCapsuleDist is not None and any(ghost.scaredTimer == 0 for ghost in ghostStates):
         score += 5 / nearestCapsuleDist  # Incentivize picking up capsules when needed
 
     # Penalize the number of remaining food dots
-    foodRemaining = len(foodList)
+    foodRemaining = currentGameState.getNumFood()
     score -= 4 * foodRemaining  # Subtract points if there's a lot of food left
 
     return score
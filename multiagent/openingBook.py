@@ -0,0 +1,136 @@
+# openingBook.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Opening books for a fixed layout, used by OpeningBookAgent in
+multiAgents.py.
+
+Every game on a layout starts from the same state, so the searches for the
+first few moves can be done once, offline and as deep as we like.  The
+builder follows the book's own moves from the start: at each of Pacman's
+first 'plies' turns it searches the position, stores the move and expands
+every combination of ghost replies to it.  Positions are keyed like the
+tablebases (see tablebase.TablebaseCodec), so the score, which does not
+change the best move, is left out and transpositions share an entry.
+
+Books are gzip-compressed pickles.  To build one:
+
+  python openingBook.py -l smallClassic -n 4 -p AlphaBetaAgent -a depth=6,evalFn=better -o smallClassic.book
+"""
+
+import gzip
+import pickle
+import time
+
+import layout
+import tablebase
+
+class OpeningBook:
+    "Best moves for the opening positions of one game setup."
+
+    def __init__(self, layoutText, numGhosts, plies, moves=None, searcher=''):
+        self.layoutText = list(layoutText)
+        self.numGhosts = numGhosts
+        self.plies = plies
+        self.moves = moves or {}  # position key -> Pacman action
+        self.searcher = searcher  # how the moves were found, for reference
+        self.codec = tablebase.TablebaseCodec(layout.Layout(self.layoutText), numGhosts)
+
+    def covers(self, gameState):
+        "Whether gameState is a game on this book's layout and setup."
+        return (gameState.data.layout.layoutText == self.layoutText and
+                gameState.getNumAgents() == self.numGhosts + 1)
+
+    def lookup(self, gameState):
+        "The book move for Pacman in gameState, or None."
+        action = self.moves.get(self.codec.encode(gameState, 0))
+        if action is not None and action in gameState.getLegalActions(0):
+            return action
+        return None
+
+    def save(self, filename):
+        f = gzip.open(filename, 'wb')
+        try:
+            pickle.dump((self.layoutText, self.numGhosts, self.plies, self.searcher, self.moves), f, protocol=2)
+        finally:
+            f.close()
+
+def loadOpeningBook(filename):
+    f = gzip.open(filename, 'rb')
+    try:
+        layoutText, numGhosts, plies, searcher, moves = pickle.load(f)
+    finally:
+        f.close()
+    return OpeningBook(layoutText, numGhosts, plies, moves, searcher)
+
+def buildOpeningBook(start, agent, plies, searcher='', verbose=False):
+    """
+    Builds the book for the game starting at start, a GameState, with
+    agent.getAction as the offline search.  Positions after Pacman's first
+    'plies' moves are left to live search.
+    """
+    book = OpeningBook(start.data.layout.layoutText, start.getNumAgents() - 1, plies, searcher=searcher)
+    numAgents = start.getNumAgents()
+    frontier = [start]
+    for ply in range(plies):
+        startTime = time.time()
+        nextFrontier, searched = [], 0
+        for gameState in frontier:
+            key = book.codec.encode(gameState, 0)
+            if key in book.moves:
+                continue
+            action = agent.getAction(gameState)
+            book.moves[key] = action
+            searched += 1
+            tablebase.resetExplored(start)
+            # Every combination of ghost replies to the book move
+            replies = [gameState.generateSuccessor(0, action)]
+            for agentIndex in range(1, numAgents):
+                replies = [state.generateSuccessor(agentIndex, ghostAction)
+                           for state in replies if not state.isWin() and not state.isLose()
+                           for ghostAction in state.getLegalActions(agentIndex)]
+            nextFrontier.extend([state for state in replies if not state.isWin() and not state.isLose()])
+        if verbose:
+            print('Ply %d: %d positions searched, %d to go, %.1fs' %
+                  (ply + 1, searched, len(nextFrontier), time.time() - startTime))
+        frontier = nextFrontier
+    return book
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    import multiAgents
+    import util
+    from pacman import GameState, parseAgentArgs
+    parser = OptionParser('USAGE: python openingBook.py -l LAYOUT [options]')
+    parser.add_option('-l', '--layout', dest='layout', default='smallClassic', help='the layout of the games')
+    parser.add_option('-n', '--plies', type='int', dest='plies', default=3,
+                      help='the number of Pacman moves to cover')
+    parser.add_option('-p', '--pacman', dest='pacman', default='AlphaBetaAgent',
+                      help='the search agent in multiAgents.py to build the book with')
+    parser.add_option('-a', '--agentArgs', dest='agentArgs', default='depth=5,evalFn=better',
+                      help='comma separated options for the search agent')
+    parser.add_option('-k', '--numghosts', type='int', dest='numGhosts', default=4,
+                      help='the maximum number of ghosts, as in pacman.py')
+    parser.add_option('-o', '--output', dest='output', default=None, help='the book file to write')
+    options, otherjunk = parser.parse_args()
+    theLayout = layout.getLayout(options.layout)
+    if theLayout is None:
+        raise Exception('The layout ' + options.layout + ' cannot be found')
+    agent = util.lookup(options.pacman, vars(multiAgents))(**parseAgentArgs(options.agentArgs))
+    start = GameState()
+    start.initialize(theLayout, options.numGhosts)
+    book = buildOpeningBook(start, agent, options.plies, '%s %s' % (options.pacman, options.agentArgs), verbose=True)
+    output = options.output or '%s.book' % options.layout
+    book.save(output)
+    print('Wrote %d positions to %s' % (len(book.moves), output))
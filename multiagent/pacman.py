@@ -174,7 +174,50 @@ class GameState:
         return self.data.capsules
 
     def getNumFood( self ):
-        return self.data.food.count()
+        if self.data._numFood is None:
+            self.data._numFood = self.data.food.count()
+        return self.data._numFood
+
+    def getNearestFoodDistance( self ):
+        """
+        Returns the Manhattan distance from Pacman to the closest food, or None
+        if there is no food left.
+
+        Answers are remembered per Pacman position, along with the food dot
+        that was closest, and shared by every state with the same food.  After
+        Pacman eats, answers for the food before are still right wherever
+        their closest dot remains, so during a search most calls are lookups.
+        """
+        if self.getNumFood() == 0:
+            return None
+        position = self.getPacmanPosition()
+        caches, food = self.data._nearestFood, self.data.food
+        for cache in caches:
+            if position in cache:
+                distance, (x, y) = cache[position]
+                if food[x][y]:
+                    caches[0][position] = cache[position]
+                    return distance
+        distance, closest = min([(manhattanDistance(position, dot), dot) for dot in food.asList()])
+        caches[0][position] = (distance, closest)
+        return distance
+
+    def getGhostDistances( self ):
+        """
+        Returns the Manhattan distance from Pacman to each ghost, in ghost order.
+        """
+        position = self.getPacmanPosition()
+        return [manhattanDistance(position, s.getPosition()) for s in self.data.agentStates[1:]]
+
+    def getNearestCapsuleDistance( self ):
+        """
+        Returns the Manhattan distance from Pacman to the closest capsule, or
+        None if there are no capsules left.
+        """
+        if not self.data.capsules:
+            return None
+        position = self.getPacmanPosition()
+        return min([manhattanDistance(position, capsule) for capsule in self.data.capsules])
 
     def getFood(self):
         """
@@ -262,6 +305,7 @@ class GameState:
 SCARED_TIME = 40    # Moves ghosts are scared
 COLLISION_TOLERANCE = 0.7 # How close ghosts must be to Pacman to kill
 TIME_PENALTY = 1 # Number of points lost each round
+NEAREST_FOOD_LEVELS = 4 # Food sets whose nearest-food answers a state can reuse
 
 class ClassicGameRules:
     """
@@ -361,11 +405,12 @@ class PacmanRules:
         # Eat food
         if state.data.food[x][y]:
             state.data.scoreChange += 10
+            numFood = state.getNumFood() - 1
             state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
             state.data._foodEaten = position
-            # TODO: cache numFood?
-            numFood = state.getNumFood()
+            state.data._numFood = numFood
+            state.data._nearestFood = [{}] + state.data._nearestFood[:NEAREST_FOOD_LEVELS - 1]
             if numFood == 0 and not state.data._lose:
                 state.data.scoreChange += 500
                 state.data._win = True
@@ -0,0 +1,217 @@
+# pondering.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Background search during the ghosts' turns, used by PonderingAgent in
+multiAgents.py.
+
+Once Pacman has picked a move, the positions the ghosts are most likely to
+leave him in are predicted and handed to a Ponderer, which runs the search
+agent's getAction on each of them while the game carries on.  When Pacman's
+next turn comes, a prediction equal to the real state gives its move
+without searching again; otherwise the background work is dropped.
+
+A 'thread' ponderer searches the predictions one after another on a deep
+copy of the agent.  Under the GIL it only gains while the main thread is
+blocked, for instance on the display's frame delay.  A hit is only waited
+for if its search has started; otherwise searching the real state at once
+is quicker.  A search that is already running cannot be stopped, so a
+dropped one finishes in the background.  A 'process' ponderer forks one
+process per prediction, which runs in parallel on other cores and is
+terminated when it is not needed.
+"""
+
+import copy
+import threading
+
+import monteCarlo
+
+def ghostOutcomes(gameState, agentIndex, ghostType=None, ghosts=None):
+    """
+    A ghost's moves as (probability, action) pairs, most likely first.
+    ghostType is a GhostAgent class from ghostAgents.py, whose instances are
+    kept in the ghosts dict, or None for a uniformly random ghost.
+    """
+    actions = gameState.getLegalActions(agentIndex)
+    outcomes = []
+    if ghostType is not None:
+        if agentIndex not in ghosts:
+            ghosts[agentIndex] = ghostType(agentIndex)
+        ghost = ghosts[agentIndex]
+        if hasattr(ghost, 'getDistributionTable'):
+            dist = dict(ghost.getDistributionTable(gameState))
+        else:
+            dist = ghost.getDistribution(gameState)
+        total = float(sum([dist.get(action, 0) for action in actions]))
+        if total > 0:
+            outcomes = [(dist[action] / total, action) for action in actions if dist.get(action, 0) > 0]
+    if not outcomes:
+        outcomes = [(1.0 / len(actions), action) for action in actions]
+    outcomes.sort(key=lambda outcome: -outcome[0])
+    return outcomes
+
+def predictPositions(gameState, action, count, ghostType=None, ghosts=None):
+    """
+    The count most likely states at Pacman's next turn after he plays
+    action, as (probability, gameState) pairs, most likely first.  Games
+    that end before then are left out, since there is nothing to search.
+    """
+    outcomes = [(1.0, gameState.generateSuccessor(0, action))]
+    for agentIndex in range(1, gameState.getNumAgents()):
+        expanded = []
+        for probability, state in outcomes:
+            if state.isWin() or state.isLose():
+                expanded.append((probability, state))
+                continue
+            for odds, ghostAction in ghostOutcomes(state, agentIndex, ghostType, ghosts):
+                expanded.append((probability * odds, state.generateSuccessor(agentIndex, ghostAction)))
+        expanded.sort(key=lambda outcome: -outcome[0])
+        # Only the likeliest prefixes can grow into the likeliest positions
+        outcomes = expanded[:count]
+    return [(p, state) for p, state in outcomes if not state.isWin() and not state.isLose()]
+
+def ponderCopy(agent):
+    """
+    A copy of agent for a background search.  Everything a search changes,
+    such as move-ordering tables and ghost models, is copied.  Monte Carlo
+    process pools are shared instead: a search only submits work to them,
+    which is thread-safe.
+    """
+    memo = {}
+    for value in vars(agent).values():
+        if isinstance(value, monteCarlo.MonteCarloPool):
+            memo[id(value)] = value
+    return copy.deepcopy(agent, memo)
+
+class _PonderThread(threading.Thread):
+    """
+    Searches gameStates[0..last] in order; last can be lowered while it
+    runs.  current is the prediction being searched.  A search that raises
+    leaves failed[i] set, and done[i] is set either way.
+    """
+
+    def __init__(self, agent, gameStates):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.agent = ponderCopy(agent)
+        self.gameStates = gameStates
+        self.last = len(gameStates) - 1
+        self.current = None
+        self.lock = threading.Lock()
+        self.actions = [None] * len(gameStates)
+        self.failed = [False] * len(gameStates)
+        self.done = [threading.Event() for state in gameStates]
+
+    def run(self):
+        for i, gameState in enumerate(self.gameStates):
+            with self.lock:
+                if i > self.last:
+                    return
+                self.current = i
+            try:
+                self.actions[i] = self.agent.getAction(gameState)
+            except Exception:
+                # The main thread searches the state again if it comes up
+                self.failed[i] = True
+            finally:
+                self.done[i].set()
+
+class ThreadPonderer:
+    "Searches the predictions one at a time in a daemon thread."
+
+    def __init__(self):
+        self.thread = None
+
+    def start(self, agent, gameStates):
+        self.cancel()
+        self.thread = _PonderThread(agent, gameStates)
+        self.thread.start()
+
+    def take(self, gameState):
+        """
+        Returns (True, action) if gameState was predicted and its search has
+        at least started, waiting for it to finish, and (False, None)
+        otherwise or if that search failed.  Either way the rest of the background work is cancelled.
+        """
+        thread, self.thread = self.thread, None
+        if thread is None:
+            return False, None
+        for i, predicted in enumerate(thread.gameStates):
+            if predicted == gameState:
+                with thread.lock:
+                    started = thread.current is not None and thread.current >= i
+                    if started:
+                        thread.last = i
+                    else:
+                        thread.last = -1
+                if not started:
+                    # The thread is still on an earlier prediction
+                    return False, None
+                thread.done[i].wait()
+                if thread.failed[i]:
+                    return False, None
+                return True, thread.actions[i]
+        thread.last = -1
+        return False, None
+
+    def cancel(self):
+        if self.thread is not None:
+            self.thread.last = -1
+            self.thread = None
+
+def _ponderWorker(agent, gameState, connection):
+    monteCarlo._initWorker()
+    connection.send(agent.getAction(gameState))
+    connection.close()
+
+class ProcessPonderer:
+    "Searches every prediction in its own forked process."
+
+    def __init__(self):
+        self.context = monteCarlo._getContext()
+        self.searches = []  # (gameState, process, connection)
+
+    def start(self, agent, gameStates):
+        self.cancel()
+        for gameState in gameStates:
+            receiver, sender = self.context.Pipe(False)
+            process = self.context.Process(target=_ponderWorker, args=(agent, gameState, sender))
+            process.daemon = True
+            process.start()
+            sender.close()
+            self.searches.append((gameState, process, receiver))
+
+    def take(self, gameState):
+        "Like ThreadPonderer.take."
+        found, action = False, None
+        for predicted, process, connection in self.searches:
+            if predicted == gameState:
+                try:
+                    action = connection.recv()
+                    found = True
+                except EOFError:
+                    pass  # The search failed; search again in the foreground
+                break
+        self.cancel()
+        return found, action
+
+    def cancel(self):
+        for predicted, process, connection in self.searches:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            connection.close()
+        self.searches = []
+
+PONDERERS = {'thread': ThreadPonderer, 'process': ProcessPonderer}
@@ -0,0 +1,365 @@
+# tablebase.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Solved value tables for small layouts, used by TablebaseAgent in
+multiAgents.py.
+
+A table holds, for every state reachable from a layout's start, the best
+score change still to come with perfect play: Pacman maximizes and the
+ghosts either minimize (minimax) or move at random (expectimax).  Because
+the score is a sum of per-move changes, this does not depend on how the
+state was reached, so a lookup replaces a search of unlimited depth.
+
+Building a table has two passes.  A breadth-first pass enumerates the
+reachable states with the game's own rules, keyed by whose turn it is, the
+agents' positions, the ghosts' directions and scared timers, and the
+remaining food and capsules, and records every move's score change and
+successor.  The states are then solved retrogradely: food and capsules can
+only be eaten, so states are solved in order of how many remain, fewest
+first.  Successors that eat something are already solved, and the moves
+within one group are iterated to a fixed point.  In minimax, ghosts that
+can keep Pacman from ever eating or dying drive the time penalty to
+-infinity; states still changing after maxSweeps are given that value.
+
+Tables are written as a gzip file of fixed-size records, a packed state
+key and its value, after a header that identifies the layout.  To build one:
+
+  python tablebase.py -l minimaxClassic -m minimax -o minimaxClassic.tb
+"""
+
+import gzip
+import pickle
+import struct
+import sys
+import time
+from array import array
+
+import ghostAgents
+import layout
+import pondering
+from game import Directions
+
+_DIRECTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+_DIRECTION_CODES = dict([(direction, i) for i, direction in enumerate(_DIRECTIONS)])
+
+class TablebaseCodec:
+    """
+    Packs a state and whose turn it is into a bytes key.  Positions are
+    kept in half cells, since scared ghosts move at half speed.  Pacman's
+    direction and the score do not affect the rest of the game and are
+    left out.
+    """
+
+    def __init__(self, layout, numGhosts):
+        self.foodPositions = layout.food.asList()
+        self.capsulePositions = list(layout.capsules)
+        self.numGhosts = numGhosts
+        self.foodBytes = (len(self.foodPositions) + 7) // 8
+        self.capsuleBytes = (len(self.capsulePositions) + 7) // 8
+        self.struct = struct.Struct('>3B%dB%ds%ds' % (4 * numGhosts, self.foodBytes, self.capsuleBytes))
+
+    def encode(self, gameState, turn):
+        agentStates = gameState.data.agentStates
+        x, y = agentStates[0].configuration.pos
+        fields = [turn, int(x * 2), int(y * 2)]
+        for ghostState in agentStates[1:]:
+            x, y = ghostState.configuration.pos
+            fields.extend((int(x * 2), int(y * 2), _DIRECTION_CODES[ghostState.configuration.direction],
+                           ghostState.scaredTimer))
+        food = gameState.data.food
+        foodMask = 0
+        for i, (x, y) in enumerate(self.foodPositions):
+            if food[x][y]:
+                foodMask |= 1 << i
+        capsules = gameState.data.capsules
+        capsuleMask = 0
+        for i, position in enumerate(self.capsulePositions):
+            if position in capsules:
+                capsuleMask |= 1 << i
+        fields.append(_toBytes(foodMask, self.foodBytes))
+        fields.append(_toBytes(capsuleMask, self.capsuleBytes))
+        return self.struct.pack(*fields)
+
+def _toBytes(mask, length):
+    return mask.to_bytes(length, 'big')
+
+def resetExplored(gameState):
+    "Clears the states that successor generation records for the autograder."
+    gameState.__class__.getAndResetExplored()
+
+def _nextTurn(gameState):
+    "Whose turn it is in a state the game handed to an agent."
+    if gameState.data._agentMoved is None:
+        return 0
+    return (gameState.data._agentMoved + 1) % gameState.getNumAgents()
+
+class TooManyStates(Exception):
+    "Raised when a layout has more reachable states than a builder allows."
+    pass
+
+class TablebaseBuilder:
+    """
+    Enumerates and solves one layout.  mode is 'minimax' or 'expectimax';
+    in expectimax, ghost is 'uniform' or a ghost agent in ghostAgents.py
+    whose getDistribution gives the odds of each ghost move.
+    """
+
+    def __init__(self, layout, mode='minimax', ghost='uniform', numGhosts=None,
+                 maxStates=5000000, maxSweeps=1000, tolerance=1e-6):
+        if mode not in ('minimax', 'expectimax'):
+            raise Exception('Unknown tablebase mode: ' + mode)
+        self.layout = layout
+        self.mode = mode
+        self.ghost = ghost
+        if numGhosts is None:
+            numGhosts = layout.getNumGhosts()
+        self.numGhosts = min(numGhosts, layout.getNumGhosts())
+        self.codec = TablebaseCodec(layout, self.numGhosts)
+        self.maxStates = maxStates
+        self.maxSweeps = maxSweeps
+        self.tolerance = mode == 'minimax' and 0 or tolerance
+        self.ghostType = None
+        if mode == 'expectimax' and ghost != 'uniform':
+            self.ghostType = getattr(ghostAgents, ghost)
+        self.ghosts = {}
+
+    def moves(self, gameState, turn):
+        "(probability, successor) for every move; probability is 1 for minimizing and maximizing agents."
+        if turn == 0 or self.mode == 'minimax':
+            return [(1.0, gameState.generateSuccessor(turn, action)) for action in gameState.getLegalActions(turn)]
+        return [(p, gameState.generateSuccessor(turn, action))
+                for p, action in pondering.ghostOutcomes(gameState, turn, self.ghostType, self.ghosts)]
+
+    def enumerate(self, start):
+        """
+        Breadth-first enumeration of the states reachable from the start
+        state of a game.  Fills in the keys, turns and strata (food and
+        capsules left) of the states, and each state's moves as slices of
+        the edge arrays.
+        """
+        numAgents = start.getNumAgents()
+        self.keys = [self.codec.encode(start, 0)]
+        self.index = {self.keys[0]: 0}
+        self.turns = array('b', [0])
+        self.strata = array('i', [start.getNumFood() + len(start.getCapsules())])
+        self.edgeStart = array('l', [0])
+        self.targets = array('l')   # successor index, or -1 when the game is over
+        self.rewards = array('d')   # score change of the move
+        self.weights = array('d')   # probability of the move at chance nodes
+        frontier = [start]
+        while frontier:
+            nextFrontier = []
+            for gameState in frontier:
+                i = len(self.edgeStart) - 1
+                turn = self.turns[i]
+                nextTurn = (turn + 1) % numAgents
+                for p, successor in self.moves(gameState, turn):
+                    self.rewards.append(successor.getScore() - gameState.getScore())
+                    self.weights.append(p)
+                    if successor.isWin() or successor.isLose():
+                        self.targets.append(-1)
+                        continue
+                    key = self.codec.encode(successor, nextTurn)
+                    j = self.index.get(key)
+                    if j is None:
+                        j = len(self.keys)
+                        if j >= self.maxStates:
+                            raise TooManyStates('More than %d reachable states' % self.maxStates)
+                        self.index[key] = j
+                        self.keys.append(key)
+                        self.turns.append(nextTurn)
+                        self.strata.append(successor.getNumFood() + len(successor.getCapsules()))
+                        nextFrontier.append(successor)
+                    self.targets.append(j)
+                self.edgeStart.append(len(self.targets))
+            resetExplored(start)
+            frontier = nextFrontier
+
+    def backUp(self, i, values):
+        "The value of state i given its successors' values."
+        first, last = self.edgeStart[i], self.edgeStart[i + 1]
+        targets, rewards = self.targets, self.rewards
+        if self.turns[i] == 0:
+            best = float('-inf')
+            for e in range(first, last):
+                j = targets[e]
+                value = rewards[e] + (j >= 0 and values[j] or 0)
+                if value > best:
+                    best = value
+            return best
+        if self.mode == 'minimax':
+            best = float('inf')
+            for e in range(first, last):
+                j = targets[e]
+                value = rewards[e] + (j >= 0 and values[j] or 0)
+                if value < best:
+                    best = value
+            return best
+        weights = self.weights
+        total = 0.0
+        for e in range(first, last):
+            j = targets[e]
+            total += weights[e] * (rewards[e] + (j >= 0 and values[j] or 0))
+        return total
+
+    def solve(self):
+        "Solves the strata in increasing order; returns the number of states valued -infinity."
+        values = array('d', [0.0]) * len(self.keys)
+        strata = {}
+        # Within a stratum, states found late are nearer the end of the game
+        for i in range(len(self.keys) - 1, -1, -1):
+            strata.setdefault(self.strata[i], []).append(i)
+        unbounded = 0
+        for stratum in sorted(strata):
+            states = strata[stratum]
+            while states:
+                changed = states
+                for sweep in range(self.maxSweeps):
+                    changed = []
+                    for i in states:
+                        value = self.backUp(i, values)
+                        if abs(value - values[i]) > self.tolerance:
+                            changed.append(i)
+                        values[i] = value
+                    if not changed:
+                        break
+                if not changed or self.mode == 'expectimax':
+                    break
+                # Ghosts can stall these forever; settle them and re-solve the rest
+                for i in changed:
+                    values[i] = float('-inf')
+                unbounded += len(changed)
+                settled = set(changed)
+                states = [i for i in states if i not in settled]
+        self.values = values
+        return unbounded
+
+    def build(self, start):
+        self.enumerate(start)
+        self.unbounded = self.solve()
+        return Tablebase(self.layout.layoutText, self.numGhosts, self.mode, self.ghost,
+                         dict(zip(self.keys, self.values)))
+
+class Tablebase:
+    "A solved layout: values for the states of one game setup, by key."
+
+    HEADER = b'PACMAN-TABLEBASE-1\n'
+
+    def __init__(self, layoutText, numGhosts, mode, ghost, values):
+        self.layoutText = list(layoutText)
+        self.numGhosts = numGhosts
+        self.mode = mode
+        self.ghost = ghost
+        self.values = values
+        self.codec = TablebaseCodec(layout.Layout(self.layoutText), numGhosts)
+
+    def covers(self, gameState):
+        "Whether gameState is a game on this table's layout and setup."
+        return (gameState.data.layout.layoutText == self.layoutText and
+                gameState.getNumAgents() == self.numGhosts + 1)
+
+    def value(self, gameState, turn=None):
+        """
+        The best score change still to come from gameState, with turn the
+        agent to move next (by default, the one after the last to move), or
+        None for a state missing from the table.
+        """
+        if gameState.isWin() or gameState.isLose():
+            return 0
+        if turn is None:
+            turn = _nextTurn(gameState)
+        return self.values.get(self.codec.encode(gameState, turn))
+
+    def actionValues(self, gameState):
+        "{action: value} for Pacman's moves in gameState, or None if any successor is missing."
+        nextTurn = 1 % gameState.getNumAgents()
+        result = {}
+        for action in gameState.getLegalActions(0):
+            successor = gameState.generateSuccessor(0, action)
+            value = self.value(successor, nextTurn)
+            if value is None:
+                return None
+            result[action] = successor.getScore() - gameState.getScore() + value
+        return result
+
+    def save(self, filename):
+        recordSize = self.codec.struct.size
+        f = gzip.open(filename, 'wb')
+        try:
+            f.write(self.HEADER)
+            header = pickle.dumps((self.layoutText, self.numGhosts, self.mode, self.ghost, recordSize), protocol=2)
+            f.write(struct.pack('>I', len(header)))
+            f.write(header)
+            values = array('d')
+            for key in sorted(self.values):
+                f.write(key)
+                values.append(self.values[key])
+            # Values follow the keys as one block of big-endian doubles
+            if sys.byteorder == 'little':
+                values.byteswap()
+            f.write(values.tobytes())
+        finally:
+            f.close()
+
+def loadTablebase(filename):
+    f = gzip.open(filename, 'rb')
+    try:
+        if f.read(len(Tablebase.HEADER)) != Tablebase.HEADER:
+            raise Exception('Not a tablebase: ' + filename)
+        length = struct.unpack('>I', f.read(4))[0]
+        layoutText, numGhosts, mode, ghost, recordSize = pickle.loads(f.read(length))
+        data = f.read()
+    finally:
+        f.close()
+    count = len(data) // (recordSize + 8)
+    keys = [data[i * recordSize:(i + 1) * recordSize] for i in range(count)]
+    values = array('d')
+    values.frombytes(data[count * recordSize:])
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return Tablebase(layoutText, numGhosts, mode, ghost, dict(zip(keys, values)))
+
+def buildTablebase(layoutName, mode='minimax', ghost='uniform', numGhosts=None, verbose=False):
+    "Builds the table for a layout by name."
+    theLayout = layout.getLayout(layoutName)
+    if theLayout is None:
+        raise Exception('The layout ' + layoutName + ' cannot be found')
+    from pacman import GameState
+    startTime = time.time()
+    builder = TablebaseBuilder(theLayout, mode, ghost, numGhosts)
+    start = GameState()
+    start.initialize(theLayout, builder.numGhosts)
+    table = builder.build(start)
+    if verbose:
+        print('%s %s: %d states, %d moves, %d unbounded, %.1fs' %
+              (layoutName, mode, len(builder.keys), len(builder.targets), builder.unbounded,
+               time.time() - startTime))
+    return table
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python tablebase.py -l LAYOUT [options]')
+    parser.add_option('-l', '--layout', dest='layout', default='trappedClassic', help='the layout to solve')
+    parser.add_option('-m', '--mode', dest='mode', default='minimax', help="'minimax' or 'expectimax'")
+    parser.add_option('-g', '--ghost', dest='ghost', default='uniform',
+                      help="expectimax ghost model: 'uniform' or a ghost agent such as DirectionalGhost")
+    parser.add_option('-k', '--numghosts', type='int', dest='numGhosts', default=None,
+                      help='the number of ghosts (default: all of the layout\'s)')
+    parser.add_option('-o', '--output', dest='output', default=None, help='the table file to write')
+    options, otherjunk = parser.parse_args()
+    table = buildTablebase(options.layout, options.mode, options.ghost, options.numGhosts, verbose=True)
+    output = options.output or '%s-%s.tb' % (options.layout, options.mode)
+    table.save(output)
+    print('Wrote ' + output)
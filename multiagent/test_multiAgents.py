@@ -0,0 +1,42 @@
+import random
+import unittest
+
+import layout
+import pacman
+from multiAgents import ExpectimaxAgent, MinimaxAgent
+
+def randomStates(layoutName, numGhosts, count, seed):
+    "Mid-game states reached by random play."
+    rng = random.Random(seed)
+    theLayout = layout.getLayout(layoutName)
+    states = []
+    while len(states) < count:
+        state = pacman.GameState()
+        state.initialize(theLayout, numGhosts)
+        for turn in range(rng.randint(0, 20) * state.getNumAgents()):
+            if state.isWin() or state.isLose():
+                break
+            agentIndex = turn % state.getNumAgents()
+            state = state.generateSuccessor(agentIndex, rng.choice(state.getLegalActions(agentIndex)))
+        if not state.isWin() and not state.isLose():
+            states.append(state)
+    return states
+
+class TestBatchedEvaluation(unittest.TestCase):
+
+    def test_batched_search_matches_scalar(self):
+        states = randomStates('smallClassic', 2, 8, 1)
+        for evalFn in ('scoreEvaluationFunction', 'betterEvaluationFunction'):
+            minimax = MinimaxAgent(evalFn=evalFn, depth='2')
+            batchedMinimax = MinimaxAgent(evalFn=evalFn, depth='2', batchSize='7')
+            expectimax = ExpectimaxAgent(evalFn=evalFn, depth='2')
+            batchedExpectimax = ExpectimaxAgent(evalFn=evalFn, depth='2', batchSize='7')
+            for state in states:
+                self.assertEqual(batchedMinimax.batchedSearch(state), minimax.minimax(state, 0, 0))
+                self.assertEqual(batchedMinimax.getAction(state), minimax.getAction(state))
+                value = batchedExpectimax.batchedSearch(state, expectation=True)[0]
+                self.assertAlmostEqual(value, expectimax.expectimax(state, 0, 0)[0])
+                self.assertEqual(batchedExpectimax.getAction(state), expectimax.getAction(state))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import layout
+import pacman
+import textDisplay
+from ghostAgents import RandomGhost
+from multiAgents import TablebaseAgent
+
+def makeState(theLayout):
+    state = pacman.GameState()
+    state.initialize(theLayout, theLayout.getNumGhosts())
+    return state
+
+class TestTablebaseAgent(unittest.TestCase):
+
+    def test_small_layout_uses_table(self):
+        theLayout = layout.Layout(['%%%%%%',
+                                   '%P. G%',
+                                   '%%%%%%'])
+        agent = TablebaseAgent(depth='2')
+        state = makeState(theLayout)
+        agent.registerInitialState(state)
+        self.assertIsNotNone(agent.table)
+        self.assertIn(agent.getAction(state), state.getLegalActions(0))
+        self.assertEqual((agent.lookups, agent.searches), (1, 0))
+
+    def test_layout_over_limit_falls_back_on_search(self):
+        theLayout = layout.getLayout('testClassic')
+        agent = TablebaseAgent(maxStates='1000', depth='2')
+        state = makeState(theLayout)
+        agent.registerInitialState(state)
+        self.assertIsNone(agent.table)
+        self.assertEqual(agent.getAction(state), agent.agent.getAction(state))
+        self.assertEqual(agent.lookups, 0)
+
+        # A whole game is played by the search agent, without building again
+        ghosts = [RandomGhost(i + 1) for i in range(theLayout.getNumGhosts())]
+        games = pacman.runGames(theLayout, agent, ghosts, textDisplay.NullGraphics(), 1, False)
+        self.assertEqual(len(games), 1)
+        self.assertEqual(agent.lookups, 0)
+        self.assertGreater(agent.searches, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+# benchmark.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Benchmarks every search algorithm and heuristic in search.py and
+searchAgents.py on every layout in layouts/, and compares the results with
+a stored baseline.
+
+Each layout is paired with the problems that make sense for it: a
+PositionSearchProblem to its dot when it has exactly one, a CornersProblem
+for corner mazes, and a FoodSearchProblem when it has several dots.  Every
+run records wall time, nodes expanded, peak traced memory, path cost and
+whether it finished within the time limit.
+
+Record a baseline, then check later changes against it:
+
+> python benchmark.py -o baseline.json
+> python benchmark.py -o results.json -b baseline.json
+
+The second command exits with status 1 if any run got slower, expanded more
+nodes, used more memory or found a more expensive path than the tolerances
+allow, or stopped finishing in time.
+"""
+
+import json
+import optparse
+import os
+import sys
+import time
+import tracemalloc
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+ALGORITHMS = [('dfs', search.depthFirstSearch), ('bfs', search.breadthFirstSearch),
+              ('ucs', search.uniformCostSearch), ('ebfs', search.externalBreadthFirstSearch)]
+
+HEURISTICS = {
+    'PositionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic', 'landmarkHeuristic'],
+    'CornersProblem': ['nullHeuristic', 'cornersHeuristic'],
+    'FoodSearchProblem': ['nullHeuristic', 'foodHeuristic'],
+}
+
+def _lookupHeuristic(name):
+    if name in dir(searchAgents):
+        return getattr(searchAgents, name)
+    return getattr(search, name)
+
+def makeProblems(name, lay):
+    """
+    Returns (problemName, makeProblem) pairs for the layout, where
+    makeProblem builds a fresh problem for every run.
+    """
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    food = gameState.getFood().asList()
+    problems = []
+    if len(food) == 1:
+        problems.append(('PositionSearchProblem', lambda: searchAgents.PositionSearchProblem(
+            gameState, goal=food[0], warn=False, visualize=False)))
+    if 'Corners' in name:
+        problems.append(('CornersProblem', lambda: searchAgents.CornersProblem(gameState)))
+    elif len(food) > 1:
+        problems.append(('FoodSearchProblem', lambda: searchAgents.FoodSearchProblem(gameState)))
+    return problems
+
+def configurations(problemName):
+    "The (label, searchFunction) pairs to run on a problem type."
+    configs = list(ALGORITHMS)
+    for heuristicName in HEURISTICS[problemName]:
+        heuristic = _lookupHeuristic(heuristicName)
+        configs.append(('astar:' + heuristicName,
+                        lambda problem, heuristic=heuristic: search.aStarSearch(problem, heuristic)))
+    return configs
+
+def runOne(makeProblem, searchFunction, timeLimit, traceMemory):
+    "Runs one search and returns its result record."
+    problem = makeProblem()
+    if traceMemory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        actions = util.TimeoutFunction(searchFunction, timeLimit)(problem)
+        status = 'solved'
+    except util.TimeoutFunctionException:
+        actions, status = None, 'timeout'
+    elapsed = time.perf_counter() - start
+    peak = None
+    if traceMemory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    record = {'status': status, 'time': elapsed, 'expanded': getattr(problem, '_expanded', None),
+              'peakMemory': peak, 'cost': None}
+    if actions is not None:
+        record['cost'] = problem.getCostOfActions(actions)
+    return record
+
+def runBenchmarks(layoutNames, timeLimit=5, traceMemory=True, verbose=True):
+    """
+    Returns a dict from 'layout/problem/configuration' to result records.
+    """
+    results = {}
+    for name in layoutNames:
+        lay = layout.getLayout(name)
+        if lay is None:
+            raise Exception('The layout ' + name + ' cannot be found')
+        for problemName, makeProblem in makeProblems(name, lay):
+            for label, searchFunction in configurations(problemName):
+                key = '%s/%s/%s' % (name, problemName, label)
+                util.mutePrint()
+                try:
+                    record = runOne(makeProblem, searchFunction, timeLimit, traceMemory)
+                finally:
+                    util.unmutePrint()
+                results[key] = record
+                if verbose:
+                    print('%-60s %-8s %8.3fs %8s expanded  cost %s' % (key, record['status'], record['time'],
+                                                                       record['expanded'], record['cost']))
+    return results
+
+def compareResults(results, baseline, timeTolerance=0.25, expandedTolerance=0.0,
+                   memoryTolerance=0.25, costTolerance=0.0, minTime=0.05):
+    """
+    Returns a list of human-readable regressions of results against baseline.
+    Tolerances are relative increases; times below minTime seconds are too
+    noisy to compare and are ignored.
+    """
+    regressions = []
+    for key in sorted(baseline):
+        old = baseline[key]
+        new = results.get(key)
+        if new is None:
+            continue
+        if old['status'] == 'solved' and new['status'] != 'solved':
+            regressions.append('%s: no longer finishes (%s)' % (key, new['status']))
+            continue
+        if new['status'] != 'solved':
+            continue
+        checks = [('time', timeTolerance), ('expanded', expandedTolerance),
+                  ('peakMemory', memoryTolerance), ('cost', costTolerance)]
+        for field, tolerance in checks:
+            before, after = old.get(field), new.get(field)
+            if before is None or after is None:
+                continue
+            if field == 'time' and max(before, after) < minTime:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append('%s: %s went from %s to %s (+%.0f%%, tolerance %.0f%%)' %
+                                   (key, field, _fmt(before), _fmt(after),
+                                    before and 100.0 * (after - before) / before or 100.0, 100 * tolerance))
+    return regressions
+
+def _fmt(value):
+    if isinstance(value, float):
+        return '%.4g' % value
+    return str(value)
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description='Benchmark the search algorithms on the search layouts.')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layout names (default: everything in layouts/)')
+    parser.add_option('-o', '--output', dest='output', default='benchmark.json',
+                      help='file to write the results to (default %default)')
+    parser.add_option('-b', '--baseline', dest='baseline', default=None,
+                      help='results file to compare against')
+    parser.add_option('-t', '--timeLimit', dest='timeLimit', type='int', default=5,
+                      help='seconds allowed per search (default %default)')
+    parser.add_option('--timeTolerance', dest='timeTolerance', type='float', default=0.25)
+    parser.add_option('--expandedTolerance', dest='expandedTolerance', type='float', default=0.0)
+    parser.add_option('--memoryTolerance', dest='memoryTolerance', type='float', default=0.25)
+    parser.add_option('--costTolerance', dest='costTolerance', type='float', default=0.0)
+    parser.add_option('--noMemory', dest='traceMemory', action='store_false', default=True,
+                      help='skip peak memory tracing, which slows searches down')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.layouts:
+        layoutNames = options.layouts.split(',')
+    else:
+        layoutNames = sorted([f[:-4] for f in os.listdir('layouts') if f.endswith('.lay')])
+    results = runBenchmarks(layoutNames, options.timeLimit, options.traceMemory)
+    f = open(options.output, 'w')
+    try:
+        json.dump(results, f, indent=1, sort_keys=True)
+    finally:
+        f.close()
+    print('Wrote %d results to %s' % (len(results), options.output))
+
+    if options.baseline:
+        f = open(options.baseline)
+        try:
+            baseline = json.load(f)
+        finally:
+            f.close()
+        regressions = compareResults(results, baseline, options.timeTolerance, options.expandedTolerance,
+                                     options.memoryTolerance, options.costTolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        print('%d regressions against %s' % (len(regressions), options.baseline))
+        sys.exit(regressions and 1 or 0)
@@ -15,6 +15,72 @@
 import search
 import random
 
+# Packed encoding
+#
+# A puzzle is packed into a single integer: the tile in cell i (counting
+# row by row from the top left) occupies the four bits starting at bit 4*i,
+# and the index of the blank cell is stored in the four bits above the nine
+# cells.  Packed puzzles are cheap to hash and compare, and a move is just a
+# couple of shifts and masks.
+
+CELL_BITS = 4
+BLANK_SHIFT = 9 * CELL_BITS
+CELL_MASK = (1 << BLANK_SHIFT) - 1
+
+def _buildMoveTable():
+    """
+      Returns, for each blank index, the tuple of (move, targetIndex) pairs
+    that are legal with the blank in that cell, in the order used by
+    legalMoves.
+    """
+    table = []
+    for blank in range( 9 ):
+        row, col = divmod(blank, 3)
+        moves = []
+        if(row != 0):
+            moves.append(('up', blank - 3))
+        if(row != 2):
+            moves.append(('down', blank + 3))
+        if(col != 0):
+            moves.append(('left', blank - 1))
+        if(col != 2):
+            moves.append(('right', blank + 1))
+        table.append(tuple(moves))
+    return tuple(table)
+
+EIGHT_PUZZLE_MOVES = _buildMoveTable()
+
+def packEightPuzzle(numbers):
+    """
+      numbers: a list of integers from 0 to 8, as accepted by EightPuzzleState
+
+    Returns the packed integer encoding of the puzzle.
+
+    >>> unpackEightPuzzle(packEightPuzzle([1, 0, 2, 3, 4, 5, 6, 7, 8]))
+    [1, 0, 2, 3, 4, 5, 6, 7, 8]
+    """
+    packed = 0
+    for index, tile in enumerate(numbers):
+        packed |= tile << (CELL_BITS * index)
+    return packed | (numbers.index(0) << BLANK_SHIFT)
+
+def unpackEightPuzzle(packed):
+    "Returns the list of nine tiles encoded in a packed puzzle."
+    return [(packed >> (CELL_BITS * index)) & 0xF for index in range( 9 )]
+
+def slideBlank(packed, blank, target):
+    """
+      Returns the packed puzzle obtained by sliding the tile in cell 'target'
+    into the blank cell 'blank'.  The target must be taken from
+    EIGHT_PUZZLE_MOVES[blank].
+    """
+    tile = (packed >> (CELL_BITS * target)) & 0xF
+    packed ^= tile << (CELL_BITS * target)
+    packed |= tile << (CELL_BITS * blank)
+    return (packed & CELL_MASK) | (target << BLANK_SHIFT)
+
+EIGHT_PUZZLE_GOAL = packEightPuzzle([0, 1, 2, 3, 4, 5, 6, 7, 8])
+
 # Module Classes
 
 class EightPuzzleState:
@@ -46,18 +112,21 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is stored as a single packed
+        integer 'packed' (see packEightPuzzle).  The 2-dimensional
+        list of lists 'cells' is rebuilt from it on demand.
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        self.packed = packEightPuzzle(numbers)
+
+    def _getCells(self):
+        numbers = unpackEightPuzzle(self.packed)
+        return [numbers[row * 3:row * 3 + 3] for row in range( 3 )]
+
+    def _getBlankLocation(self):
+        return divmod(self.packed >> BLANK_SHIFT, 3)
+
+    cells = property(_getCells)
+    blankLocation = property(_getBlankLocation)
 
     def isGoal( self ):
         """
@@ -77,13 +146,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.packed == EIGHT_PUZZLE_GOAL
 
     def legalMoves( self ):
         """
@@ -95,17 +158,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return [move for move, _ in EIGHT_PUZZLE_MOVES[self.packed >> BLANK_SHIFT]]
 
     def result(self, move):
         """
@@ -113,37 +166,18 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
-        return newPuzzle
+        blank = self.packed >> BLANK_SHIFT
+        for legalMove, target in EIGHT_PUZZLE_MOVES[blank]:
+            if legalMove == move:
+                newPuzzle = EightPuzzleState.__new__(EightPuzzleState)
+                newPuzzle.packed = slideBlank(self.packed, blank, target)
+                return newPuzzle
+        raise Exception("Illegal Move: %s" % str(move))
 
     # Utilities for comparison and display
     def __eq__(self, other):
@@ -155,13 +189,10 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return self.packed == other.packed
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.packed)
 
     def __getAsciiString(self):
         """
@@ -183,23 +214,24 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
-# TODO: Implement The methods in this class
-
 class EightPuzzleSearchProblem(search.SearchProblem):
     """
       Implementation of a SearchProblem for the  Eight Puzzle domain
 
-      Each state is represented by an instance of an eightPuzzle.
+      Each state is the packed integer encoding of an eightPuzzle (see
+      packEightPuzzle), so no puzzle objects are created during search.
     """
     def __init__(self,puzzle):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
+        self.startState = puzzle.packed
+        self._expanded = 0
 
     def getStartState(self):
-        return puzzle
+        return self.startState
 
     def isGoalState(self,state):
-        return state.isGoal()
+        return state == EIGHT_PUZZLE_GOAL
 
     def getSuccessors(self,state):
         """
@@ -207,10 +239,10 @@ class EightPuzzleSearchProblem(search.SearchProblem):
           each succesor is either left, right, up, or down
           from the original state and the cost is 1.0 for each
         """
-        succ = []
-        for a in state.legalMoves():
-            succ.append((state.result(a), a, 1))
-        return succ
+        self._expanded += 1
+        blank = state >> BLANK_SHIFT
+        return [(slideBlank(state, blank, target), move, 1)
+                for move, target in EIGHT_PUZZLE_MOVES[blank]]
 
     def getCostOfActions(self, actions):
         """
@@ -237,7 +269,7 @@ def loadEightPuzzle(puzzleNumber):
 
       puzzleNumber can range from 0 to 5.
 
-      >>> print loadEightPuzzle(0)
+      >>> print(loadEightPuzzle(0))
       -------------
       | 1 |   | 2 |
       -------------
@@ -277,5 +309,5 @@ if __name__ == '__main__':
         print('After %d move%s: %s' % (i, ("", "s")[i>1], a))
         print(curr)
 
-        raw_input("Press return for the next state...")   # wait for key stroke
+        input("Press return for the next state...")   # wait for key stroke
         i += 1
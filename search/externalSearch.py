@@ -0,0 +1,215 @@
+# externalSearch.py
+# -----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+External-memory breadth-first search, for state spaces whose visited set
+does not fit in RAM.
+
+Each BFS layer lives on disk as a sorted, gzip-compressed file of encoded
+states.  Successors of a layer are gathered in a bounded in-memory buffer,
+sorted and spilled to run files.  The runs are then merged and duplicates
+are removed by a streaming merge against the previous layers, so memory
+use is bounded by the buffer size rather than the number of states.
+
+No parent pointers are stored.  Once a goal is found, the path is rebuilt
+backwards: each earlier layer is scanned for a state with a successor
+equal to the current one.
+
+States are turned into bytes by a codec with encode(state) and
+decode(data).  Encodings must be canonical: equal states must encode to
+equal bytes.  Problems can supply a compact codec through a
+getStateCodec() method (see FoodSearchProblem); otherwise PickleCodec is
+used.
+"""
+
+import gzip
+import heapq
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+
+_LENGTH = struct.Struct('>I')
+
+class PickleCodec:
+    """
+    Encodes states with pickle.  This is canonical for states built from
+    ints, strings and tuples, such as positions or (position, bitmask)
+    pairs, but not for arbitrary objects.
+    """
+    def encode(self, state):
+        return pickle.dumps(state, protocol=2)
+
+    def decode(self, data):
+        return pickle.loads(data)
+
+def defaultCodec(problem):
+    if hasattr(problem, 'getStateCodec'):
+        return problem.getStateCodec()
+    return PickleCodec()
+
+# Layer files
+
+def _writeRecords(filename, records):
+    "Writes an iterable of byte strings as length-prefixed records; returns how many."
+    count = 0
+    f = gzip.open(filename, 'wb', compresslevel=1)
+    try:
+        for record in records:
+            f.write(_LENGTH.pack(len(record)))
+            f.write(record)
+            count += 1
+    finally:
+        f.close()
+    return count
+
+def _readRecords(filename):
+    f = gzip.open(filename, 'rb')
+    try:
+        while True:
+            header = f.read(_LENGTH.size)
+            if not header:
+                return
+            yield f.read(_LENGTH.unpack(header)[0])
+    finally:
+        f.close()
+
+def _unique(sortedRecords):
+    previous = None
+    for record in sortedRecords:
+        if record != previous:
+            yield record
+            previous = record
+
+def _subtract(sortedRecords, sortedExclusions):
+    """
+    Yields the records that appear in none of the sorted exclusion streams,
+    advancing every stream at most once, like a merge join.
+    """
+    streams = []
+    for exclusion in sortedExclusions:
+        iterator = iter(exclusion)
+        streams.append([next(iterator, None), iterator])
+    for record in sortedRecords:
+        excluded = False
+        for stream in streams:
+            while stream[0] is not None and stream[0] < record:
+                stream[0] = next(stream[1], None)
+            if stream[0] == record:
+                excluded = True
+        if not excluded:
+            yield record
+
+class ExternalBreadthFirstSearch:
+    """
+    One external-memory BFS over a problem, with its layer files kept in
+    'directory'.  When undirected is set, states can only repeat from the
+    two previous layers, so only those are merged against.
+    """
+
+    def __init__(self, problem, codec=None, directory=None, bufferSize=200000, undirected=False):
+        self.problem = problem
+        self.codec = codec or defaultCodec(problem)
+        self.ownsDirectory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix='ebfs')
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        self.bufferSize = bufferSize
+        self.undirected = undirected
+        self.layerSizes = []
+
+    def _layerFile(self, depth):
+        return os.path.join(self.directory, 'layer%05d.gz' % depth)
+
+    def _spill(self, buffer, runs):
+        buffer.sort()
+        filename = os.path.join(self.directory, 'run%05d.gz' % len(runs))
+        _writeRecords(filename, _unique(buffer))
+        runs.append(filename)
+        del buffer[:]
+
+    def _expandLayer(self, depth):
+        """
+        Expands layer 'depth' into layer depth + 1.  Returns the encoded goal
+        state if one is found in layer 'depth', and None otherwise.
+        """
+        problem, codec = self.problem, self.codec
+        buffer, runs = [], []
+        for record in _readRecords(self._layerFile(depth)):
+            state = codec.decode(record)
+            if problem.isGoalState(state):
+                for run in runs:
+                    os.remove(run)
+                return record
+            for successor, action, stepCost in problem.getSuccessors(state):
+                buffer.append(codec.encode(successor))
+            if len(buffer) >= self.bufferSize:
+                self._spill(buffer, runs)
+        if buffer:
+            self._spill(buffer, runs)
+
+        first = 0
+        if self.undirected:
+            first = max(0, depth - 1)
+        merged = _unique(heapq.merge(*[_readRecords(run) for run in runs]))
+        previous = [_readRecords(self._layerFile(d)) for d in range(first, depth + 1)]
+        self.layerSizes.append(_writeRecords(self._layerFile(depth + 1), _subtract(merged, previous)))
+        for run in runs:
+            os.remove(run)
+        return None
+
+    def _rebuildPath(self, goalDepth, goalRecord):
+        "Walks back through the layers from the goal to the start."
+        problem, codec = self.problem, self.codec
+        actions = []
+        target = goalRecord
+        for depth in range(goalDepth - 1, -1, -1):
+            for record in _readRecords(self._layerFile(depth)):
+                found = None
+                for successor, action, stepCost in problem.getSuccessors(codec.decode(record)):
+                    if codec.encode(successor) == target:
+                        found = action
+                        break
+                if found is not None:
+                    actions.append(found)
+                    target = record
+                    break
+        actions.reverse()
+        return actions
+
+    def search(self):
+        "Returns a shortest list of actions to a goal, or [] if there is none."
+        try:
+            self.layerSizes = [_writeRecords(self._layerFile(0), [self.codec.encode(self.problem.getStartState())])]
+            depth = 0
+            while self.layerSizes[-1] > 0:
+                goal = self._expandLayer(depth)
+                if goal is not None:
+                    return self._rebuildPath(depth, goal)
+                depth += 1
+            return []  # Return empty if no solution is found
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        if self.ownsDirectory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+def externalBreadthFirstSearch(problem, codec=None, directory=None, bufferSize=200000, undirected=False):
+    """
+    Breadth-first search with its frontier and visited states on disk.  See
+    ExternalBreadthFirstSearch for the parameters.
+    """
+    return ExternalBreadthFirstSearch(problem, codec, directory, bufferSize, undirected).search()
@@ -1,6 +1,7 @@
 """
 Code to create a simple graph in a similar format to the test cases, but much simplified.
 """
+from array import array
 from search import SearchProblem, bfs, dfs, ucs, astar
 import util
 
@@ -83,6 +84,139 @@ def read_graph(filename=None, graph=None):
     return GraphProblem(start, goals, edges)
     
 
+class CSRGraphProblem(SearchProblem):
+    """
+    A graph search problem stored in compressed sparse row (CSR) form, for
+    graphs too large for GraphProblem's dict of lists of tuples.
+
+    Node names are interned to integer ids, and states are those ids.  The
+    outgoing edges of node u are the entries offsets[u] to offsets[u+1] of
+    the parallel arrays targets, actionIds and costs.  Action strings are
+    interned as well and only looked up when successors are returned.
+    """
+    def __init__(self, start, goals, names, nodeIds, offsets, targets, actionIds, costs, actions):
+        self.start = start
+        self.goals = goals
+        self.names = names
+        self.nodeIds = nodeIds
+        self.offsets = offsets
+        self.targets = targets
+        self.actionIds = actionIds
+        self.costs = costs
+        self.actions = actions
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.start
+
+    def isGoalState(self, state):
+        return state in self.goals
+
+    def getSuccessors(self, state):
+        """
+        Returns (successor id, action, stepCost) triples read straight from the
+        CSR arrays.  Nodes without outgoing edges have no successors.
+        """
+        self._expanded += 1
+        begin, end = self.offsets[state], self.offsets[state + 1]
+        actions = self.actions
+        return list(zip(self.targets[begin:end],
+                        [actions[a] for a in self.actionIds[begin:end]],
+                        self.costs[begin:end]))
+
+    def getCostOfActions(self, actions):
+        """
+        Follows actions from the start node, returning their total cost, or
+        999999 if some action does not leave the current node.
+        """
+        state, total = self.start, 0
+        for action in actions:
+            for successor, edgeAction, cost in self.getSuccessors(state):
+                if edgeAction == action:
+                    state, total = successor, total + cost
+                    break
+            else:
+                return 999999
+        return total
+
+    def getNodeName(self, state):
+        return self.names[state]
+
+    def getNodeId(self, name):
+        return self.nodeIds[name]
+
+
+def read_csr_graph(filename=None, graph=None):
+    """
+    Reads the same format as read_graph into a CSRGraphProblem.
+
+    The input is consumed one line at a time, and edges are appended to
+    flat typed arrays instead of per-edge tuples, so memory stays close to
+    a few machine words per edge.  The arrays are then bucketed by source
+    node with a counting sort, keeping the file order of each node's edges.
+    """
+    if graph is None and filename is None or graph is not None and filename is not None:
+        raise Exception('Either filename or graph, but not both, must be given')
+    if filename is not None:
+        lines = open(filename)
+    else:
+        lines = iter(graph.split('\n'))
+
+    nodeIds, names = {}, []
+    actionIds, actions = {}, []
+    def intern(name, ids, table):
+        if name not in ids:
+            ids[name] = len(table)
+            table.append(name)
+        return ids[name]
+
+    start, goals = None, None
+    sources, targets, edgeActions, costs = array('l'), array('l'), array('l'), array('d')
+    try:
+        for line in lines:
+            line = line.strip()
+            if len(line) == 0 or line.startswith('#'):
+                continue
+            if start is None:
+                start = line.split('=')[1].strip()
+            elif goals is None:
+                goals = {g.strip() for g in line.split('=')[1].split(',') if len(g.strip()) > 0}
+            else:
+                (src, action, dst, cost) = line.split()
+                sources.append(intern(src, nodeIds, names))
+                edgeActions.append(intern(action, actionIds, actions))
+                targets.append(intern(dst, nodeIds, names))
+                costs.append(float(cost))
+    finally:
+        if filename is not None:
+            lines.close()
+
+    startId = intern(start, nodeIds, names)
+    goalIds = {intern(g, nodeIds, names) for g in goals}
+
+    # Counting sort of the edges by source node
+    numNodes = len(names)
+    offsets = array('l', [0]) * (numNodes + 1)
+    for src in sources:
+        offsets[src + 1] += 1
+    for node in range(numNodes):
+        offsets[node + 1] += offsets[node]
+    slots = array('l', offsets)
+    numEdges = len(sources)
+    sortedTargets = array('l', [0]) * numEdges
+    sortedActions = array('l', [0]) * numEdges
+    sortedCosts = array('d', [0.0]) * numEdges
+    for edge in range(numEdges):
+        src = sources[edge]
+        slot = slots[src]
+        slots[src] = slot + 1
+        sortedTargets[slot] = targets[edge]
+        sortedActions[slot] = edgeActions[edge]
+        sortedCosts[slot] = costs[edge]
+
+    return CSRGraphProblem(startId, goalIds, names, nodeIds, offsets, sortedTargets, sortedActions, sortedCosts, actions)
+    
+
 def test_create():
     graph = """
 # Graph files look like this:
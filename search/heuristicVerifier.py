@@ -0,0 +1,241 @@
+# heuristicVerifier.py
+# --------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Checks a heuristic against every reachable state of a search problem, rather
+than only the states along one solution path as the autograder does.
+
+The reachable state space is enumerated once (up to a cap) into integer ids
+with flat edge arrays.  True goal distances come from a backwards uniform
+cost search started from every goal state at once.  A single pass over the
+arrays then checks that the heuristic is non-negative, zero at goals,
+admissible (h(s) <= h*(s)) and consistent (h(s) <= c(s, s') + h(s')).
+It also reports how tight the heuristic is.
+
+For example:
+
+> python heuristicVerifier.py -l mediumCorners -p CornersProblem -H cornersHeuristic
+> python heuristicVerifier.py -l trickySearch -p FoodSearchProblem -H foodHeuristic
+"""
+
+from array import array
+import heapq
+import optparse
+import sys
+
+import util
+
+# Slack for floating point step costs
+EPSILON = 1e-6
+
+class HeuristicReport:
+    """
+    The outcome of verifyHeuristic.  Each list of violations holds at most
+    maxViolations examples, while the counts cover every state and edge.
+    """
+
+    def __init__(self, maxViolations):
+        self.maxViolations = maxViolations
+        self.numStates = 0
+        self.numEdges = 0
+        self.numGoals = 0
+        self.complete = True
+        self.unsolvable = 0
+        self.counts = util.Counter()
+        self.negative = []        # (state, h)
+        self.nonzeroGoals = []    # (state, h)
+        self.inadmissible = []    # (state, h, trueCost)
+        self.inconsistent = []    # (state, action, successor, stepCost, h, successorH)
+        self.tightness = 0.0      # mean of h / h* over solvable non-goal states
+
+    def add(self, kind, violation):
+        self.counts[kind] += 1
+        examples = getattr(self, kind)
+        if len(examples) < self.maxViolations:
+            examples.append(violation)
+
+    def isAdmissible(self):
+        return self.counts['inadmissible'] == 0 and self.counts['negative'] == 0 and self.counts['nonzeroGoals'] == 0
+
+    def isConsistent(self):
+        return self.isAdmissible() and self.counts['inconsistent'] == 0
+
+    def __str__(self):
+        lines = ['States: %d (%d goals, %d unable to reach a goal), edges: %d%s' %
+                 (self.numStates, self.numGoals, self.unsolvable, self.numEdges,
+                  not self.complete and ' [state cap reached, true costs are upper bounds]' or '')]
+        lines.append('Admissible: %s, consistent: %s, mean tightness h/h*: %.3f' %
+                     (self.isAdmissible(), self.isConsistent(), self.tightness))
+        for kind, label in [('negative', 'negative values'), ('nonzeroGoals', 'non-zero at a goal'),
+                            ('inadmissible', 'inadmissible states'), ('inconsistent', 'inconsistent edges')]:
+            if self.counts[kind] > 0:
+                lines.append('%d %s, e.g.:' % (self.counts[kind], label))
+                for violation in getattr(self, kind):
+                    lines.append('    ' + _describe(kind, violation))
+        return '\n'.join(lines)
+
+def _describe(kind, violation):
+    if kind == 'inadmissible':
+        state, h, trueCost = violation
+        return 'h=%s > h*=%s at %s' % (h, trueCost, _stateString(state))
+    if kind == 'inconsistent':
+        state, action, successor, cost, h, successorH = violation
+        return 'h=%s > %s + %s after %s from %s' % (h, cost, successorH, action, _stateString(state))
+    state, h = violation
+    return 'h=%s at %s' % (h, _stateString(state))
+
+def _stateString(state):
+    # Food grids print as whole boards; keep only the dot positions
+    if isinstance(state, tuple):
+        return '(' + ', '.join([_stateString(s) for s in state]) + ')'
+    if hasattr(state, 'asList'):
+        return 'food%s' % str(state.asList())
+    return str(state)
+
+def enumerateStates(problem, maxStates=200000):
+    """
+    Breadth-first enumeration of the states reachable from the start.
+
+    Returns (states, goals, edgeStarts, sources, targets, costs, actions,
+    complete): states maps id -> state, goals is an array of goal flags,
+    and the edges of state i are the entries edgeStarts[i] to
+    edgeStarts[i+1] of the parallel arrays.  States found after the cap is
+    reached are not expanded, and complete is then False.
+    """
+    start = problem.getStartState()
+    ids = {start: 0}
+    states = [start]
+    goals = array('b')
+    edgeStarts = array('l', [0])
+    sources, targets, costs, actions = array('l'), array('l'), array('d'), []
+    complete = True
+    current = 0
+    while current < len(states):
+        state = states[current]
+        goals.append(problem.isGoalState(state) and 1 or 0)
+        if current < maxStates:
+            for successor, action, stepCost in problem.getSuccessors(state):
+                if successor not in ids:
+                    ids[successor] = len(states)
+                    states.append(successor)
+                sources.append(current)
+                targets.append(ids[successor])
+                costs.append(stepCost)
+                actions.append(action)
+        else:
+            complete = False
+        edgeStarts.append(len(targets))
+        current += 1
+    return states, goals, edgeStarts, sources, targets, costs, actions, complete
+
+def trueCosts(numStates, goals, sources, targets, costs):
+    """
+    Cheapest cost from every state to any goal, by uniform cost search over
+    reversed edges from all goals at once.  Unreachable entries stay None.
+    """
+    reverseStarts = array('l', [0]) * (numStates + 1)
+    for target in targets:
+        reverseStarts[target + 1] += 1
+    for i in range(numStates):
+        reverseStarts[i + 1] += reverseStarts[i]
+    slots = array('l', reverseStarts)
+    reverseEdges = array('l', [0]) * len(targets)
+    for edge in range(len(targets)):
+        target = targets[edge]
+        reverseEdges[slots[target]] = edge
+        slots[target] += 1
+
+    distances = [None] * numStates
+    heap = [(0, i) for i in range(numStates) if goals[i]]
+    for _, i in heap:
+        distances[i] = 0
+    heapq.heapify(heap)
+    while heap:
+        distance, state = heapq.heappop(heap)
+        if distance > distances[state]:
+            continue
+        for slot in range(reverseStarts[state], reverseStarts[state + 1]):
+            edge = reverseEdges[slot]
+            source, newDistance = sources[edge], distance + costs[edge]
+            if distances[source] is None or newDistance < distances[source]:
+                distances[source] = newDistance
+                heapq.heappush(heap, (newDistance, source))
+    return distances
+
+def verifyHeuristic(problem, heuristic, maxStates=200000, maxViolations=5):
+    """
+    Checks heuristic on every state reachable in problem and returns a
+    HeuristicReport.  The heuristic is called exactly once per state.
+    """
+    states, goals, edgeStarts, sources, targets, costs, actions, complete = enumerateStates(problem, maxStates)
+    numStates = len(states)
+    distances = trueCosts(numStates, goals, sources, targets, costs)
+    values = [heuristic(state, problem) for state in states]
+
+    report = HeuristicReport(maxViolations)
+    report.numStates, report.numEdges, report.complete = numStates, len(targets), complete
+    ratios, numRatios = 0.0, 0
+    for i in range(numStates):
+        h, trueCost = values[i], distances[i]
+        if h < 0:
+            report.add('negative', (states[i], h))
+        if goals[i]:
+            report.numGoals += 1
+            if h != 0:
+                report.add('nonzeroGoals', (states[i], h))
+        if trueCost is None:
+            report.unsolvable += 1
+        else:
+            if h > trueCost + EPSILON:
+                report.add('inadmissible', (states[i], h, trueCost))
+            if trueCost > 0:
+                ratios += h / trueCost
+                numRatios += 1
+        for edge in range(edgeStarts[i], edgeStarts[i + 1]):
+            successorH = values[targets[edge]]
+            if h > costs[edge] + successorH + EPSILON:
+                report.add('inconsistent', (states[i], actions[edge], states[targets[edge]], costs[edge], h, successorH))
+    if numRatios > 0:
+        report.tightness = ratios / numRatios
+    return report
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description='Verify a heuristic on every reachable state of a layout.')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumCorners',
+                      help='the layout to load (default %default)')
+    parser.add_option('-p', '--problem', dest='problem', default='CornersProblem',
+                      help='the search problem type in searchAgents.py (default %default)')
+    parser.add_option('-H', '--heuristic', dest='heuristic', default='cornersHeuristic',
+                      help='the heuristic in searchAgents.py or search.py (default %default)')
+    parser.add_option('-m', '--maxStates', dest='maxStates', type='int', default=200000,
+                      help='stop expanding after this many states (default %default)')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    import layout, pacman, search, searchAgents
+    options = readCommand(sys.argv[1:])
+    lay = layout.getLayout(options.layout)
+    if lay is None:
+        raise Exception('The layout ' + options.layout + ' cannot be found')
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    problem = getattr(searchAgents, options.problem)(gameState)
+    if options.heuristic in dir(searchAgents):
+        heuristic = getattr(searchAgents, options.heuristic)
+    else:
+        heuristic = getattr(search, options.heuristic)
+    print(verifyHeuristic(problem, heuristic, options.maxStates))
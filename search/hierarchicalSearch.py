@@ -0,0 +1,232 @@
+# hierarchicalSearch.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Hierarchical pathfinding (HPA*) for layouts far larger than bigMaze.
+
+The walls Grid is cut into square clusters.  Wherever an open stretch of
+cells crosses the border between two clusters, an entrance is made of one
+or two pairs of facing cells.  The entrance cells become the nodes of an
+abstract graph, joined by 1-step edges across borders and by precomputed
+shortest distances between the entrances of each cluster.
+
+A query links the start and goal to the entrances of their own clusters,
+runs A* over the small abstract graph and then refines each abstract edge
+into Directions with a search confined to one cluster.  Refined paths
+inside clusters are memoized, so repeated queries get cheaper.  Paths are
+near-optimal: the detours the abstraction forces through entrance cells
+are typically a few percent of the path length.
+"""
+
+import heapq
+
+from game import Directions
+
+# Entrances longer than this get a transition at each end instead of one in the middle
+MAX_SINGLE_TRANSITION = 6
+
+_MOVES = [(Directions.NORTH, 0, 1), (Directions.SOUTH, 0, -1),
+          (Directions.EAST, 1, 0), (Directions.WEST, -1, 0)]
+
+class HierarchicalPathfinder:
+    """
+    Preprocesses a walls Grid into clusters of clusterSize x clusterSize
+    cells and answers findPath(start, goal) queries.
+    """
+
+    def __init__(self, walls, clusterSize=10):
+        self.walls = walls
+        self.width, self.height = walls.width, walls.height
+        self.clusterSize = clusterSize
+        self.edges = {}        # node -> {neighbor: cost}
+        self.clusterNodes = {} # cluster -> [node]
+        self._paths = {}       # (a, b) -> actions inside one cluster
+        self._buildEntrances()
+        for cluster, nodes in self.clusterNodes.items():
+            self._connectCluster(cluster, nodes)
+
+    # Preprocessing
+
+    def clusterOf(self, position):
+        x, y = position
+        return (int(x) // self.clusterSize, int(y) // self.clusterSize)
+
+    def _clusterBounds(self, cluster):
+        size = self.clusterSize
+        cx, cy = cluster
+        return (cx * size, cy * size, min((cx + 1) * size, self.width), min((cy + 1) * size, self.height))
+
+    def _addNode(self, node):
+        if node not in self.edges:
+            self.edges[node] = {}
+            self.clusterNodes.setdefault(self.clusterOf(node), []).append(node)
+
+    def _addTransition(self, a, b):
+        self._addNode(a)
+        self._addNode(b)
+        self.edges[a][b] = 1
+        self.edges[b][a] = 1
+
+    def _buildEntrances(self):
+        walls, size = self.walls, self.clusterSize
+        # Borders between horizontally adjacent clusters, then vertical ones
+        for x in range(size - 1, self.width - 1, size):
+            self._scanBorder([((x, y), (x + 1, y)) for y in range(self.height)], size)
+        for y in range(size - 1, self.height - 1, size):
+            self._scanBorder([((x, y), (x, y + 1)) for x in range(self.width)], size)
+
+    def _scanBorder(self, pairs, size):
+        "Splits a border into open runs, cut at cluster corners, and adds transitions."
+        walls = self.walls
+        run = []
+        for i, (a, b) in enumerate(pairs):
+            isOpen = not walls[a[0]][a[1]] and not walls[b[0]][b[1]]
+            if isOpen:
+                run.append((a, b))
+            if run and (not isOpen or i % size == size - 1 or i == len(pairs) - 1):
+                if len(run) < MAX_SINGLE_TRANSITION:
+                    self._addTransition(*run[len(run) // 2])
+                else:
+                    self._addTransition(*run[0])
+                    self._addTransition(*run[-1])
+                run = []
+
+    def _connectCluster(self, cluster, nodes):
+        "Adds intra-cluster edges between every pair of entrances that can reach each other."
+        for node in nodes:
+            distances = self._clusterDistances(node, cluster)
+            for other in nodes:
+                if other != node and other in distances:
+                    self.edges[node][other] = distances[other]
+
+    def _clusterDistances(self, source, cluster):
+        "BFS distances from source to every cell of its cluster it can reach without leaving it."
+        walls = self.walls
+        minX, minY, maxX, maxY = self._clusterBounds(cluster)
+        distances = {source: 0}
+        frontier = [source]
+        distance = 0
+        while frontier:
+            distance += 1
+            nextFrontier = []
+            for x, y in frontier:
+                for _, dx, dy in _MOVES:
+                    nx, ny = x + dx, y + dy
+                    if minX <= nx < maxX and minY <= ny < maxY and not walls[nx][ny] and (nx, ny) not in distances:
+                        distances[(nx, ny)] = distance
+                        nextFrontier.append((nx, ny))
+            frontier = nextFrontier
+        return distances
+
+    # Queries
+
+    def _clusterPath(self, start, goal):
+        """
+        Shortest actions from start to goal without leaving their shared
+        cluster, or None.  Paths between entrances are memoized.
+        """
+        key = (start, goal)
+        if key in self._paths:
+            return self._paths[key]
+        walls = self.walls
+        minX, minY, maxX, maxY = self._clusterBounds(self.clusterOf(start))
+        parents = {start: None}
+        frontier = [start]
+        while frontier and goal not in parents:
+            nextFrontier = []
+            for x, y in frontier:
+                for action, dx, dy in _MOVES:
+                    nx, ny = x + dx, y + dy
+                    if minX <= nx < maxX and minY <= ny < maxY and not walls[nx][ny] and (nx, ny) not in parents:
+                        parents[(nx, ny)] = (action, (x, y))
+                        nextFrontier.append((nx, ny))
+            frontier = nextFrontier
+        if goal not in parents:
+            return None
+        actions = []
+        position = goal
+        while parents[position] is not None:
+            action, position = parents[position]
+            actions.append(action)
+        actions.reverse()
+        if start in self.edges and goal in self.edges:
+            self._paths[key] = actions
+        return actions
+
+    def _abstractPath(self, start, goal):
+        "A* over the abstract graph with start and goal linked into their clusters."
+        startCluster, goalCluster = self.clusterOf(start), self.clusterOf(goal)
+        startLinks = self._clusterDistances(start, startCluster)
+        goalLinks = self._clusterDistances(goal, goalCluster)
+        startEdges = dict([(n, startLinks[n]) for n in self.clusterNodes.get(startCluster, []) if n in startLinks])
+        goalEdges = dict([(n, goalLinks[n]) for n in self.clusterNodes.get(goalCluster, []) if n in goalLinks])
+
+        def heuristic(node):
+            return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
+
+        best = {start: 0}
+        parents = {start: None}
+        heap = [(heuristic(start), 0, start)]
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node == goal:
+                path = [goal]
+                while parents[node] is not None:
+                    node = parents[node]
+                    path.append(node)
+                path.reverse()
+                return path
+            if cost > best[node]:
+                continue
+            if node == start:
+                # A start on an entrance also keeps its edges into other clusters
+                neighbors = list(self.edges.get(start, {}).items()) + list(startEdges.items())
+            else:
+                neighbors = list(self.edges[node].items())
+            if node in goalEdges:
+                neighbors.append((goal, goalEdges[node]))
+            for neighbor, edgeCost in neighbors:
+                newCost = cost + edgeCost
+                if neighbor not in best or newCost < best[neighbor]:
+                    best[neighbor] = newCost
+                    parents[neighbor] = node
+                    heapq.heappush(heap, (newCost + heuristic(neighbor), newCost, neighbor))
+        return None
+
+    def findPath(self, start, goal):
+        """
+        Returns a list of Directions from start to goal, or None if the goal
+        cannot be reached.
+        """
+        start, goal = (int(start[0]), int(start[1])), (int(goal[0]), int(goal[1]))
+        if start == goal:
+            return []
+        if self.clusterOf(start) == self.clusterOf(goal):
+            local = self._clusterPath(start, goal)
+            if local is not None:
+                return local
+        nodes = self._abstractPath(start, goal)
+        if nodes is None:
+            return None
+        actions = []
+        for a, b in zip(nodes, nodes[1:]):
+            if self.clusterOf(a) == self.clusterOf(b):
+                actions.extend(self._clusterPath(a, b))
+            else:
+                # A 1-step transition between facing entrance cells
+                for action, dx, dy in _MOVES:
+                    if (a[0] + dx, a[1] + dy) == b:
+                        actions.append(action)
+                        break
+        return actions
@@ -0,0 +1,187 @@
+# pathCache.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A cache for search results that are recomputed across games, such as the
+plan a SearchAgent makes for a layout or the maze distance between two
+points.
+
+Keys are digests of everything that determines the result: the layout
+walls, the problem type, its start state, goal and food (food is reduced
+to a bitmask), any cost function with the values it closes over, and the
+search function and heuristic names.
+Digests are stable across processes, so results can be shared through an
+on-disk tier as well as the in-memory LRU tier.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+from game import Grid
+
+def gridBits(grid):
+    "The contents of a boolean Grid as one integer, bit x*height+y per cell."
+    bits, base = 0, 1
+    for column in grid.data:
+        for value in column:
+            if value:
+                bits |= base
+            base <<= 1
+    return bits
+
+def layoutDigest(walls):
+    """
+    A stable digest of a walls Grid.  It is remembered on the Grid itself,
+    which the layout shares with every GameState of a game.
+    """
+    digest = getattr(walls, '_layoutDigest', None)
+    if digest is None:
+        digest = hashlib.sha1(('%d %d %x' % (walls.width, walls.height, gridBits(walls))).encode()).hexdigest()
+        walls._layoutDigest = digest
+    return digest
+
+def _stableKey(value):
+    "Rewrites states so that repr() is the same in every process."
+    if isinstance(value, Grid):
+        return ('Grid', value.width, value.height, gridBits(value))
+    if isinstance(value, (tuple, list)):
+        return tuple([_stableKey(v) for v in value])
+    if isinstance(value, (set, frozenset)):
+        return ('set',) + tuple(sorted([repr(_stableKey(v)) for v in value]))
+    return value
+
+def _functionKey(function):
+    """
+    Identifies a cost function by its code and by the values it closes
+    over, since lambdas have no useful name.  Closed-over objects without a
+    stable repr give keys that never match in another process, which only
+    costs a cache miss.
+    """
+    code = getattr(function, '__code__', None)
+    if code is None:
+        return repr(_stableKey(function))
+    cells = []
+    for cell in getattr(function, '__closure__', None) or ():
+        try:
+            cells.append(_valueKey(cell.cell_contents))
+        except ValueError:  # A cell that is not filled in yet
+            cells.append(None)
+    defaults = getattr(function, '__defaults__', None) or ()
+    return (code.co_code.hex(), repr(code.co_consts), tuple(cells),
+            tuple([_valueKey(value) for value in defaults]),
+            _valueKey(getattr(function, '__self__', None)))
+
+def _valueKey(value):
+    if getattr(value, '__code__', None) is not None:
+        return _functionKey(value)
+    return repr(_stableKey(value))
+
+def makeKey(*parts):
+    return hashlib.sha1(repr(_stableKey(parts)).encode()).hexdigest()
+
+def searchKey(problem, fnName, heuristicName):
+    """
+    The cache key for solving 'problem' with the named search function and
+    heuristic.  Problems are identified by their class, walls, start state,
+    goal, food, corners and cost function, whichever they have.
+    """
+    return makeKey('search', type(problem).__name__, layoutDigest(problem.walls),
+                   problem.getStartState(), getattr(problem, 'goal', None),
+                   getattr(problem, 'food', None), getattr(problem, 'corners', None),
+                   _functionKey(getattr(problem, 'costFn', None)),
+                   fnName, heuristicName)
+
+class PathCache:
+    """
+    An LRU cache of at most 'capacity' results in memory, backed by one JSON
+    file per key in 'directory' when a directory is given.  Values must be
+    JSON-serializable (action lists, distances).
+    """
+
+    def __init__(self, capacity=1024, directory=None):
+        self.capacity = capacity
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits, self.misses = 0, 0
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        "Returns the cached value for key, or None."
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.directory is not None and os.path.exists(self._filename(key)):
+            f = open(self._filename(key))
+            try:
+                value = json.load(f)
+            finally:
+                f.close()
+            self._remember(key, value)
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory is not None:
+            # Write then rename, so readers in other processes never see half a file
+            temporary = '%s.%d.tmp' % (self._filename(key), os.getpid())
+            f = open(temporary, 'w')
+            try:
+                json.dump(value, f)
+            finally:
+                f.close()
+            os.replace(temporary, self._filename(key))
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        "Empties the in-memory tier; files on disk are left alone."
+        self.entries.clear()
+
+_PATH_CACHES = {}
+
+def getPathCache(directory=None):
+    """
+    Returns the cache shared by everything in this process that uses the
+    same directory (None for memory only).
+    """
+    if directory not in _PATH_CACHES:
+        _PATH_CACHES[directory] = PathCache(directory=directory)
+    return _PATH_CACHES[directory]
+
+_DISTANCE_CACHE = None
+
+def getDistanceCache():
+    """
+    Returns the in-memory cache of maze distances.  It is kept apart from
+    the plan caches so that heavy distance lookups do not evict plans, nor
+    the other way around.
+    """
+    global _DISTANCE_CACHE
+    if _DISTANCE_CACHE is None:
+        _DISTANCE_CACHE = PathCache(capacity=65536)
+    return _DISTANCE_CACHE
@@ -0,0 +1,134 @@
+# portfolio.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Runs a portfolio of search configurations on the same SearchProblem in
+separate processes and keeps whichever answer is wanted: the first valid
+solution, or the cheapest one found before a deadline.  Processes that are
+still running when the answer is known are terminated.
+
+Configurations are (label, searchFunction) pairs, where searchFunction takes
+a SearchProblem and returns a list of actions, exactly like the functions in
+search.py.  PortfolioSearchAgent in searchAgents.py builds them from names.
+"""
+
+import multiprocessing
+import queue
+import time
+
+# Seconds between checks that some worker is still alive
+POLL_INTERVAL = 0.1
+
+def _getContext():
+    # Forking lets workers inherit problems and heuristics that can't be
+    # pickled (lambdas, Grids captured in closures, ...)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+def followActions(problem, actions):
+    """
+    Replays actions through problem.getSuccessors.  Returns the total cost
+    if they are legal and end in a goal state, and None otherwise.
+    """
+    state, cost = problem.getStartState(), 0
+    for action in actions:
+        for successor, successorAction, stepCost in problem.getSuccessors(state):
+            if successorAction == action:
+                state, cost = successor, cost + stepCost
+                break
+        else:
+            return None
+    if not problem.isGoalState(state):
+        return None
+    return cost
+
+def _portfolioWorker(label, searchFunction, problem, results):
+    # Workers must never draw on the parent's display
+    import __main__
+    if '_display' in dir(__main__):
+        __main__._display = None
+    start = time.time()
+    try:
+        actions = searchFunction(problem)
+        expanded = getattr(problem, '_expanded', None)
+        cost = followActions(problem, actions)
+        results.put((label, actions, cost, expanded, time.time() - start, None))
+    except Exception as e:
+        results.put((label, None, None, None, time.time() - start, '%s: %s' % (type(e).__name__, e)))
+
+def runPortfolio(problem, configurations, timeout=None, best=False, verbose=True):
+    """
+      problem: a SearchProblem
+      configurations: a list of (label, searchFunction) pairs
+      timeout: seconds to wait before giving up on the remaining searches
+      best: if False return the first valid solution, otherwise wait for
+            every search (or the timeout) and return the cheapest
+
+    Returns (label, actions, cost) for the chosen solution, or None if no
+    search produced a valid solution in time.  Ties on cost go to the
+    configuration that finished first.
+    """
+    context = _getContext()
+    results = context.Queue()
+    workers = []
+    for label, searchFunction in configurations:
+        worker = context.Process(target=_portfolioWorker, args=(label, searchFunction, problem, results))
+        worker.daemon = True
+        worker.start()
+        workers.append(worker)
+
+    deadline = None
+    if timeout is not None:
+        deadline = time.time() + timeout
+    chosen = None
+    try:
+        reported = 0
+        while reported < len(workers):
+            wait = POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.time())
+                if wait <= 0:
+                    break
+            try:
+                label, actions, cost, expanded, elapsed, error = results.get(timeout=wait)
+            except queue.Empty:
+                # Workers killed by a signal or the OOM killer never report
+                if not [worker for worker in workers if worker.is_alive()] and results.empty():
+                    if verbose:
+                        print('[Portfolio] %d searches died without reporting' % (len(workers) - reported))
+                    break
+                continue
+            reported += 1
+            if verbose:
+                if error is not None:
+                    print('[Portfolio] %s failed after %.2f seconds: %s' % (label, elapsed, error))
+                elif cost is None:
+                    print('[Portfolio] %s returned an invalid plan after %.2f seconds' % (label, elapsed))
+                else:
+                    print('[Portfolio] %s found cost %s in %.2f seconds (%s nodes expanded)' % (label, cost, elapsed, expanded))
+            if cost is None:
+                continue
+            if chosen is None or cost < chosen[2]:
+                chosen = (label, actions, cost)
+            if not best:
+                break
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join()
+        results.close()
+    return chosen
@@ -17,6 +17,7 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import time
 import util
 
 class SearchProblem:
@@ -224,8 +225,191 @@ def aStarSearch(problem, heuristic=nullHeuristic):
     return []  # Return empty if no solution is found
 
 
+class ResumableSearch:
+    """
+    A graph search that can be run a few expansions at a time.
+
+    The search itself is a generator that yields after every expansion, so it
+    can be paused between calls to step() and picked up where it left off, or
+    cancelled outright.  This lets callers such as the Pacman game loop or a
+    job scheduler interleave a long search with other work.
+
+    Subclasses choose the frontier and how nodes are prioritized; the
+    expansion order of each one matches the corresponding function above.
+
+    Typical use:
+
+      search = ResumableAStarSearch(problem, manhattanHeuristic)
+      while not search.step(100):
+          print(search.expanded, search.frontierSize())
+      actions = search.solution
+    """
+
+    # Whether a state may be expanded again when reached by a cheaper path
+    reopen = False
+
+    def __init__(self, problem, heuristic=nullHeuristic):
+        self.problem = problem
+        self.heuristic = heuristic
+        self.frontier = self.makeFrontier()
+        self.expanded = 0
+        self.solution = None
+        self.finished = False
+        self.cancelled = False
+        self._best = None # (heuristic, -cost, actions) of the most promising expanded node
+        self._generator = self._search()
+
+    def makeFrontier(self):
+        util.raiseNotDefined()
+
+    def push(self, node, cost, state):
+        """
+        Pushes a (state, actions, cost, h) node onto the frontier.  h is the
+        state's heuristic value, or None if it has not been computed.
+        """
+        util.raiseNotDefined()
+
+    def frontierSize(self):
+        "The number of nodes waiting on the frontier, duplicates included."
+        frontier = self.frontier
+        if isinstance(frontier, util.PriorityQueue):
+            return len(frontier.heap)
+        return len(frontier.list)
+
+    def bestSoFar(self):
+        """
+        Returns the solution if one has been found.  Otherwise returns the
+        actions reaching the expanded state with the lowest heuristic value,
+        preferring the more costly (deeper) path on ties.
+        """
+        if self.solution is not None:
+            return self.solution
+        if self._best is None:
+            return []
+        return self._best[2]
+
+    def isDone(self):
+        return self.finished or self.cancelled
+
+    def cancel(self):
+        "Stops the search for good; later calls to step() do nothing."
+        self.cancelled = True
+        self._generator.close()
+
+    def step(self, expansions=1):
+        """
+        Runs the search for at most the given number of expansions.  Returns
+        True once the search has finished or been cancelled.
+        """
+        if self.isDone():
+            return True
+        for i in range(expansions):
+            if next(self._generator, None) is None:
+                break
+        return self.isDone()
+
+    def run(self, expansions=None, deadline=None, batch=100):
+        """
+        Runs until done, or until 'expansions' more nodes have been expanded,
+        or until time.time() passes 'deadline'.  The clock is checked every
+        'batch' expansions.  Returns True once the search is done.
+        """
+        while not self.isDone():
+            count = batch
+            if expansions is not None:
+                if expansions <= 0:
+                    break
+                count = min(batch, expansions)
+                expansions -= count
+            self.step(count)
+            if deadline is not None and time.time() >= deadline:
+                break
+        return self.isDone()
+
+    def _search(self):
+        problem, heuristic = self.problem, self.heuristic
+        visited = {}
+        self.push((problem.getStartState(), [], 0, None), 0, problem.getStartState())
+
+        while not self.frontier.isEmpty():
+            current_state, actions, current_cost, h = self.frontier.pop()
+
+            if problem.isGoalState(current_state):
+                self.solution = actions
+                break
+
+            if current_state in visited and not (self.reopen and current_cost < visited[current_state]):
+                continue
+            visited[current_state] = current_cost
+
+            if h is None:
+                h = heuristic(current_state, problem)
+            if self._best is None or (h, -current_cost) < self._best[:2]:
+                self._best = (h, -current_cost, actions)
+
+            for successor, action, step_cost in problem.getSuccessors(current_state):
+                if self.reopen or successor not in visited:
+                    self.push((successor, actions + [action], current_cost + step_cost, None),
+                              current_cost + step_cost, successor)
+            self.expanded += 1
+            yield self
+
+        if self.solution is None:
+            self.solution = []  # Return empty if no solution is found
+        self.finished = True
+
+class ResumableDepthFirstSearch(ResumableSearch):
+    "depthFirstSearch, one expansion at a time."
+    def makeFrontier(self):
+        return util.Stack()
+
+    def push(self, node, cost, state):
+        self.frontier.push(node)
+
+class ResumableBreadthFirstSearch(ResumableSearch):
+    "breadthFirstSearch, one expansion at a time."
+    def makeFrontier(self):
+        return util.Queue()
+
+    def push(self, node, cost, state):
+        self.frontier.push(node)
+
+class ResumableUniformCostSearch(ResumableSearch):
+    "uniformCostSearch, one expansion at a time."
+    reopen = True
+
+    def makeFrontier(self):
+        return util.PriorityQueue()
+
+    def push(self, node, cost, state):
+        self.frontier.push(node, cost)
+
+class ResumableAStarSearch(ResumableUniformCostSearch):
+    "aStarSearch, one expansion at a time."
+    def push(self, node, cost, state):
+        # The heuristic value travels with the node, so bestSoFar can reuse it
+        h = self.heuristic(state, self.problem)
+        self.frontier.push(node[:3] + (h,), cost + h)
+
+def externalBreadthFirstSearch(problem):
+    """
+    breadthFirstSearch with its layers kept on disk, for state spaces too
+    large for memory.  See externalSearch.py.
+    """
+    import externalSearch
+    return externalSearch.externalBreadthFirstSearch(problem)
+
+
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+ebfs = externalBreadthFirstSearch
+
+resumableSearches = {
+    'dfs': ResumableDepthFirstSearch, 'depthFirstSearch': ResumableDepthFirstSearch,
+    'bfs': ResumableBreadthFirstSearch, 'breadthFirstSearch': ResumableBreadthFirstSearch,
+    'ucs': ResumableUniformCostSearch, 'uniformCostSearch': ResumableUniformCostSearch,
+    'astar': ResumableAStarSearch, 'aStarSearch': ResumableAStarSearch,
+}
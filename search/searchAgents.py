@@ -37,9 +37,13 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
+from array import array
+import heapq
 import util
 import time
 import search
+import pathCache
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -56,6 +60,37 @@ class GoWestAgent(Agent):
 #       after you fill in parts of search.py          #
 #######################################################
 
+def _lookupHeuristic(heuristic):
+    "Returns the heuristic function in searchAgents.py or search.py named heuristic."
+    if heuristic in globals().keys():
+        return globals()[heuristic]
+    elif heuristic in dir(search):
+        return getattr(search, heuristic)
+    raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
+
+def _lookupSearchFunction(fn, heuristic='nullHeuristic'):
+    """
+    Returns the function in search.py named fn, with the named heuristic
+    bound to it if it takes one.
+    """
+    if fn not in dir(search):
+        raise AttributeError(fn + ' is not a search function in search.py.')
+    func = getattr(search, fn)
+    if not _takesHeuristic(func):
+        return func
+    heur = _lookupHeuristic(heuristic)
+    # Note: this bit of Python trickery combines the search algorithm and the heuristic
+    return lambda x: func(x, heuristic=heur)
+
+def _takesHeuristic(func):
+    return 'heuristic' in func.__code__.co_varnames
+
+def _lookupProblemType(prob):
+    "Returns the search problem class in searchAgents.py named prob."
+    if prob not in globals().keys() or not prob.endswith('Problem'):
+        raise AttributeError(prob + ' is not a search problem type in SearchAgents.py.')
+    return globals()[prob]
+
 class SearchAgent(Agent):
     """
     This very general search agent finds a path using a supplied search
@@ -73,33 +108,23 @@ class SearchAgent(Agent):
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
-        # Warning: some advanced Python magic is employed below to find the right functions and problems
-
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', cache=''):
         # Get the search function from the name and heuristic
-        if fn not in dir(search):
-            raise AttributeError(fn + ' is not a search function in search.py.')
-        func = getattr(search, fn)
-        if 'heuristic' not in func.__code__.co_varnames:
-            print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
-        else:
-            if heuristic in globals().keys():
-                heur = globals()[heuristic]
-            elif heuristic in dir(search):
-                heur = getattr(search, heuristic)
-            else:
-                raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
+        self.searchFunction = _lookupSearchFunction(fn, heuristic)
+        if _takesHeuristic(getattr(search, fn)):
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
-            # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+        else:
+            print('[SearchAgent] using function ' + fn)
 
         # Get the search problem type from the name
-        if prob not in globals().keys() or not prob.endswith('Problem'):
-            raise AttributeError(prob + ' is not a search problem type in SearchAgents.py.')
-        self.searchType = globals()[prob]
+        self.searchType = _lookupProblemType(prob)
         print('[SearchAgent] using problem type ' + prob)
 
+        # Optionally reuse plans across games: cache=memory or cache=<directory>
+        self.pathCache, self.cacheName = None, (fn, heuristic)
+        if cache:
+            self.pathCache = pathCache.getPathCache(cache != 'memory' and cache or None)
+
     def registerInitialState(self, state):
         """
         This is the first time that the agent sees the layout of the game
@@ -112,7 +137,17 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
+        self.actionIndex = 0 # The same agent plays every game of a run
+        cache = getattr(self, 'pathCache', None)
+        if cache is not None:
+            key = pathCache.searchKey(problem, *self.cacheName)
+            self.actions = cache.get(key)
+            if self.actions is not None:
+                print('Path found in cache with total cost of %d' % problem.getCostOfActions(self.actions))
+                return
         self.actions  = self.searchFunction(problem) # Find a path
+        if cache is not None:
+            cache.put(key, self.actions)
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
@@ -133,6 +168,260 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+class TimeSlicedSearchAgent(SearchAgent):
+    """
+    A SearchAgent that plans with a resumable search (see search.py) and
+    spends at most 'budget' seconds of search per turn.  While the plan is
+    unfinished Pacman waits with Directions.STOP, so the game loop keeps
+    running instead of blocking in registerInitialState.
+
+    Options for fn are the keys of search.resumableSearches, e.g.
+
+    > python pacman.py -l bigMaze -p TimeSlicedSearchAgent -a fn=astar,heuristic=manhattanHeuristic,budget=0.01
+    """
+
+    def __init__(self, fn='bfs', prob='PositionSearchProblem', heuristic='nullHeuristic', budget='0.05'):
+        if fn not in search.resumableSearches:
+            raise AttributeError(fn + ' is not a resumable search in search.py.')
+        self.searchClass = search.resumableSearches[fn]
+        self.heuristic = _lookupHeuristic(heuristic)
+        self.searchType = _lookupProblemType(prob)
+        self.budget = float(budget)
+        print('[TimeSlicedSearchAgent] using %s, heuristic %s and problem type %s' % (fn, heuristic, prob))
+
+    def registerInitialState(self, state):
+        self.problem = self.searchType(state)
+        self.search = self.searchClass(self.problem, self.heuristic)
+        self.actions = None
+        self.actionIndex = 0
+        self._think()
+
+    def _think(self):
+        if self.search.run(deadline=time.time() + self.budget):
+            self.actions = self.search.solution
+            totalCost = self.problem.getCostOfActions(self.actions)
+            print('Path found with total cost of %d after %d expansions' % (totalCost, self.search.expanded))
+
+    def getAction(self, state):
+        if self.actions is None:
+            self._think()
+            if self.actions is None:
+                return Directions.STOP
+        return SearchAgent.getAction(self, state)
+
+class PortfolioSearchAgent(SearchAgent):
+    """
+    A SearchAgent that races several search configurations in separate
+    processes (see portfolio.py) and follows the first valid plan, or the
+    cheapest plan found within 'timeout' seconds when best is set.
+
+    configs is a list of fn or fn:heuristic names separated by semicolons:
+
+    > python pacman.py -l bigMaze -p PortfolioSearchAgent -a "configs=bfs;ucs;astar:manhattanHeuristic"
+    """
+
+    def __init__(self, configs='bfs;ucs;astar:manhattanHeuristic', prob='PositionSearchProblem', timeout='', best='False'):
+        self.configurations = []
+        for config in configs.split(';'):
+            fn, _, heuristic = config.partition(':')
+            self.configurations.append((config, _lookupSearchFunction(fn, heuristic or 'nullHeuristic')))
+        self.searchType = _lookupProblemType(prob)
+        self.timeout = timeout and float(timeout) or None
+        self.best = best in [True, 'True', 'true', '1']
+
+    def registerInitialState(self, state):
+        import portfolio
+        starttime = time.time()
+        problem = self.searchType(state)
+        result = portfolio.runPortfolio(problem, self.configurations, self.timeout, self.best)
+        if result is None:
+            raise Exception('No search in the portfolio found a valid plan')
+        label, self.actions, totalCost = result
+        self.actionIndex = 0
+        print('Path found by %s with total cost of %d in %.1f seconds' % (label, totalCost, time.time() - starttime))
+
+class HierarchicalSearchAgent(SearchAgent):
+    """
+    A SearchAgent for very large position-search layouts: it plans the path
+    to goal (1,1) with the hierarchical pathfinder in hierarchicalSearch.py,
+    whose clustered abstraction is built once per layout and reused by
+    every game played on it.
+
+    > python pacman.py -l bigMaze -p HierarchicalSearchAgent -a clusterSize=8
+    """
+
+    def __init__(self, clusterSize='10', goal='1,1'):
+        self.clusterSize = int(clusterSize)
+        self.goal = tuple([int(c) for c in goal.split(',')])
+        self.pathfinders = {}
+
+    def registerInitialState(self, state):
+        import hierarchicalSearch
+        starttime = time.time()
+        walls = state.getWalls()
+        key = pathCache.layoutDigest(walls)
+        if key not in self.pathfinders:
+            self.pathfinders[key] = hierarchicalSearch.HierarchicalPathfinder(walls, self.clusterSize)
+        self.actions = self.pathfinders[key].findPath(state.getPacmanPosition(), self.goal) or []
+        self.actionIndex = 0
+        print('Path found with total cost of %d in %.3f seconds' % (len(self.actions), time.time() - starttime))
+
+class DStarLiteAgent(Agent):
+    """
+    An agent that walks to a goal position and repairs its plan every move
+    with D* Lite (Koenig & Likhachev) instead of searching from scratch.
+
+    Entering a cell costs 1, plus ghostPenalty if a non-scared ghost is
+    within ghostRadius (Manhattan distance) of it.  Each turn the agent
+    re-reads the ghost positions, and only the cells whose cost changed are
+    fed back into the search.  The search runs backwards from the goal, so
+    Pacman moving only shifts the heuristic by the accumulated offset km.
+    A new goal restarts the search.
+
+    > python pacman.py -l mediumScaryMaze -p DStarLiteAgent -g DirectionalGhost
+    """
+
+    def __init__(self, goal='1,1', ghostPenalty='20', ghostRadius='2'):
+        self.index = 0
+        self.goal = tuple([int(c) for c in goal.split(',')])
+        self.ghostPenalty = float(ghostPenalty)
+        self.ghostRadius = int(ghostRadius)
+
+    def registerInitialState(self, state):
+        walls = state.getWalls()
+        self.graph = mazeGraph(walls)
+        self.expanded, self.moves = 0, 0
+        self.penalties = {}
+        self._updatePenalties(state)
+        self._restart(state.getPacmanPosition(), self.goal)
+
+    def _restart(self, start, goal):
+        "Throws away all search state and plans from scratch towards goal."
+        self.start, self.last, self.goal = start, start, goal
+        self.km = 0
+        self.g, self.rhs = {}, {goal: 0}
+        self.queue, self.queued = [], {}
+        self._push(goal)
+        self._computeShortestPath()
+
+    # Costs
+
+    def _cost(self, cell):
+        return 1 + self.penalties.get(cell, 0)
+
+    def _updatePenalties(self, state):
+        """
+        Recomputes which cells are near a dangerous ghost.  Returns the cells
+        whose cost changed.
+        """
+        radius = self.ghostRadius
+        penalties = {}
+        for ghostState in state.getGhostStates():
+            if ghostState.scaredTimer > 0:
+                continue
+            gx, gy = util.nearestPoint(ghostState.getPosition())
+            for dx in range(-radius, radius + 1):
+                span = radius - abs(dx)
+                for dy in range(-span, span + 1):
+                    cell = (int(gx + dx), int(gy + dy))
+                    if cell in self.graph:
+                        penalties[cell] = self.ghostPenalty
+        changed = [cell for cell in penalties if cell not in self.penalties]
+        changed += [cell for cell in self.penalties if cell not in penalties]
+        self.penalties = penalties
+        return changed
+
+    # D* Lite
+
+    def _heuristic(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _key(self, cell):
+        best = min(self.g.get(cell, float('inf')), self.rhs.get(cell, float('inf')))
+        return (best + self._heuristic(self.start, cell) + self.km, best)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+
+    def _top(self):
+        "Drops stale heap entries and returns the smallest live (key, cell), or None."
+        while self.queue:
+            key, cell = self.queue[0]
+            if self.queued.get(cell) == key:
+                return key, cell
+            heapq.heappop(self.queue)
+        return None
+
+    def _updateVertex(self, cell):
+        infinity = float('inf')
+        if cell != self.goal:
+            g = self.g
+            self.rhs[cell] = min([self._cost(nextCell) + g.get(nextCell, infinity)
+                                  for _, nextCell in self.graph[cell]] or [infinity])
+        if self.g.get(cell, infinity) != self.rhs.get(cell, infinity):
+            self._push(cell)
+        elif cell in self.queued:
+            del self.queued[cell]
+
+    def _computeShortestPath(self):
+        infinity = float('inf')
+        start = self.start
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            oldKey, cell = top
+            if oldKey >= self._key(start) and self.rhs.get(start, infinity) == self.g.get(start, infinity):
+                break
+            heapq.heappop(self.queue)
+            del self.queued[cell]
+            self.expanded += 1
+            newKey = self._key(cell)
+            if oldKey < newKey:
+                self._push(cell)
+            elif self.g.get(cell, infinity) > self.rhs.get(cell, infinity):
+                self.g[cell] = self.rhs[cell]
+                for _, previous in self.graph[cell]:
+                    self._updateVertex(previous)
+            else:
+                self.g[cell] = infinity
+                self._updateVertex(cell)
+                for _, previous in self.graph[cell]:
+                    self._updateVertex(previous)
+
+    def setGoal(self, goal, state):
+        "Changes the goal; D* Lite cannot reuse a search rooted at the old one."
+        if goal != self.goal:
+            self._restart(state.getPacmanPosition(), goal)
+
+    def getAction(self, state):
+        position = state.getPacmanPosition()
+        if position == self.goal:
+            return Directions.STOP
+        self.moves += 1
+        self.km += self._heuristic(self.last, position)
+        self.last = self.start = position
+
+        # Only the cells around ghosts that appeared or left need repairing.
+        # Entering a cell is an edge from each of its neighbors.
+        for cell in self._updatePenalties(state):
+            for _, previous in self.graph[cell]:
+                self._updateVertex(previous)
+        self._computeShortestPath()
+
+        infinity = float('inf')
+        legal = state.getLegalPacmanActions()
+        choices = [(self._cost(nextCell) + self.g.get(nextCell, infinity), action)
+                   for action, nextCell in self.graph[position] if action in legal]
+        if not choices or min(choices)[0] == infinity:
+            return Directions.STOP
+        return min(choices)[1]
+
+    def final(self, state):
+        print('D* Lite expanded %d nodes over %d moves' % (self.expanded, self.moves))
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -262,6 +551,92 @@ def euclideanHeuristic(position, problem, info={}):
     xy2 = problem.goal
     return ( (xy1[0] - xy2[0]) ** 2 + (xy1[1] - xy2[1]) ** 2 ) ** 0.5
 
+class Landmarks:
+    """
+    Differential (ALT) bounds on maze distance from a few landmark cells.
+
+    For any landmark L, the triangle inequality gives
+        |d(L, a) - d(L, b)| <= d(a, b)
+    so the maximum over the landmarks is an admissible, consistent estimate
+    of the maze distance between a and b.  Landmarks are picked far apart
+    (each one maximizes its distance to those already chosen), and the BFS
+    distances from each are kept in one flat array per landmark, indexed by
+    x * height + y, for O(k * cells) memory.
+    """
+
+    def __init__(self, walls, numLandmarks=8):
+        self.walls = walls
+        self.height = walls.height
+        self.landmarks = []
+        self.distances = []
+        openCells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        if not openCells:
+            return
+
+        # Start from the cell farthest from an arbitrary one, then keep
+        # adding the cell farthest from every landmark chosen so far
+        nearest = self._bfs(openCells[0])
+        for i in range(min(numLandmarks, len(openCells))):
+            landmark = max(openCells, key=lambda cell: nearest[self._index(cell)])
+            if i > 0 and nearest[self._index(landmark)] <= 0:
+                break # Every reachable cell is already a landmark
+            distances = self._bfs(landmark)
+            self.landmarks.append(landmark)
+            self.distances.append(distances)
+            if i == 0:
+                nearest = array('l', distances)
+            else:
+                for j in range(len(nearest)):
+                    if 0 <= distances[j] < nearest[j] or nearest[j] < 0 <= distances[j]:
+                        nearest[j] = distances[j]
+
+    def _index(self, position):
+        x, y = position
+        return int(x) * self.height + int(y)
+
+    def _bfs(self, source):
+        "Maze distances from source, with -1 for walls and unreachable cells."
+        walls = self.walls
+        distances = array('l', [-1]) * (walls.width * walls.height)
+        distances[self._index(source)] = 0
+        queue = util.Queue()
+        queue.push(source)
+        while not queue.isEmpty():
+            position = queue.pop()
+            distance = distances[self._index(position)] + 1
+            for neighbor in Actions.getLegalNeighbors(position, walls):
+                index = self._index(neighbor)
+                if distances[index] < 0:
+                    distances[index] = distance
+                    queue.push(neighbor)
+        return distances
+
+    def lowerBound(self, a, b):
+        "An admissible estimate of the maze distance between positions a and b."
+        indexA, indexB = self._index(a), self._index(b)
+        bound = 0
+        for distances in self.distances:
+            distanceA, distanceB = distances[indexA], distances[indexB]
+            if distanceA >= 0 and distanceB >= 0:
+                difference = abs(distanceA - distanceB)
+                if difference > bound:
+                    bound = difference
+        return bound
+
+_LANDMARKS = {}
+
+def getLandmarks(walls, numLandmarks=8):
+    "The Landmarks for a layout, built on first use and shared afterwards."
+    key = (pathCache.layoutDigest(walls), numLandmarks)
+    if key not in _LANDMARKS:
+        _LANDMARKS[key] = Landmarks(walls, numLandmarks)
+    return _LANDMARKS[key]
+
+def landmarkHeuristic(position, problem, info={}):
+    "The landmark (ALT) distance heuristic for a PositionSearchProblem, never below Manhattan distance"
+    return max(getLandmarks(problem.walls).lowerBound(position, problem.goal),
+               util.manhattanDistance(position, problem.goal))
+
 #####################################################
 # This portion is incomplete.  Time to write code!  #
 #####################################################
@@ -272,7 +647,7 @@ class CornersProblem(search.SearchProblem):
 
     A state in this problem is a tuple (pacmanPosition, visitedCorners), where:
       - pacmanPosition: a tuple (x, y) representing Pacman's current position.
-      - visitedCorners: a tuple of booleans indicating whether each corner has been visited.
+      - visitedCorners: an int bitmask; bit i is set once self.corners[i] has been visited.
     """
 
     def __init__(self, startingGameState):
@@ -283,6 +658,12 @@ class CornersProblem(search.SearchProblem):
         self.startingPosition = startingGameState.getPacmanPosition()  # Initial Pacman position
         top, right = self.walls.height - 2, self.walls.width - 2  # Define the layout bounds
         self.corners = ((1, 1), (1, top), (right, 1), (right, top))  # Define the four corners
+        self.allCorners = (1 << len(self.corners)) - 1  # Mask with every corner visited
+
+        # Map each corner to its bit (corners may coincide on tiny layouts)
+        self.cornerBits = {}
+        for i, corner in enumerate(self.corners):
+            self.cornerBits[corner] = self.cornerBits.get(corner, 0) | (1 << i)
 
         # Check for food at each corner, and issue a warning if missing
         for corner in self.corners:
@@ -290,12 +671,13 @@ class CornersProblem(search.SearchProblem):
                 print(f'Warning: no food in corner {corner}')
 
         self._expanded = 0  # Counter for number of expanded nodes
-        # Start with Pacman's position and mark all corners as not visited
-        self.startState = (self.startingPosition, (False, False, False, False))
+        self.heuristicInfo = {}  # A dictionary for the heuristic to store information
+        # Start with Pacman's position; a corner Pacman starts on counts as visited
+        self.startState = (self.startingPosition, self.cornerBits.get(self.startingPosition, 0))
 
     def getStartState(self):
         """
-        Returns the starting state, which is Pacman's initial position and the four unvisited corners.
+        Returns the starting state, which is Pacman's initial position and the visited corners mask.
         """
         return self.startState
 
@@ -303,34 +685,26 @@ class CornersProblem(search.SearchProblem):
         """
         Returns True if all four corners have been visited.
         """
-        _, visitedCorners = state
-        return all(visitedCorners)  # Goal is reached when all corners have been visited
+        return state[1] == self.allCorners  # Goal is reached when every corner bit is set
 
     def getSuccessors(self, state):
         """
         For a given state, returns a list of successor states, actions to reach them, and a cost of 1.
         """
         successors = []
-        currentPosition, visitedCorners = state
+        (x, y), visitedCorners = state
+        cornerBits = self.cornerBits
 
         # Try moving in all four directions (North, South, East, West)
         for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = currentPosition
             dx, dy = Actions.directionToVector(action)
             next_x, next_y = int(x + dx), int(y + dy)
 
             # Check if the next position is within bounds and not blocked by a wall
             if not self.walls[next_x][next_y]:
                 nextPosition = (next_x, next_y)
-                newVisitedCorners = list(visitedCorners)
-
-                # If Pacman reaches a corner, mark it as visited
-                if nextPosition in self.corners:
-                    cornerIndex = self.corners.index(nextPosition)
-                    newVisitedCorners[cornerIndex] = True
-
-                # Create a new state with the updated visited corners and add it to successors
-                newState = (nextPosition, tuple(newVisitedCorners))
+                # If Pacman reaches a corner, set its bit in the mask
+                newState = (nextPosition, visitedCorners | cornerBits.get(nextPosition, 0))
                 successors.append((newState, action, 1))
 
         self._expanded += 1  # Keep track of how many nodes have been expanded
@@ -355,22 +729,55 @@ class CornersProblem(search.SearchProblem):
 
 def cornersHeuristic(state, problem):
     """
-    Heuristic for the CornersProblem. Estimates the minimum distance required to 
-    visit all unvisited corners from the current position.
+    Heuristic for the CornersProblem: the exact length of the shortest tour
+    from the current position through every unvisited corner, using true
+    maze distances.  This is the cost of the relaxed problem with no other
+    constraints, so it is admissible and consistent.
+
+    Maze distances from each corner are computed once per problem, along
+    with the shortest tour from each corner through each set of corners.
+    Results are cached per (position, visitedCorners) state.
     """
-    current_position, visited_corners = state
-    corners = problem.corners  # Coordinates of all four corners
-    unvisited_corners = [corner for i, corner in enumerate(corners) if not visited_corners[i]]
-
-    # If all corners are visited, the heuristic is 0
-    if not unvisited_corners:
-        return 0
-
-    # Calculate the Manhattan distance to each unvisited corner
-    distances = [util.manhattanDistance(current_position, corner) for corner in unvisited_corners]
+    info = problem.heuristicInfo
+    cache = info.get('cornerTour')
+    if cache is None:
+        # BFS distance maps from every corner, shared by every later call
+        corners = problem.corners
+        distances = [mazeDistances(corner, problem.walls) for corner in corners]
+        info['cornerDistances'] = distances
+        info['cornerTour'] = cache = {}
+        info['tourFrom'] = _cornerTourTable(corners, distances, problem.allCorners)
+
+    value = cache.get(state)
+    if value is None:
+        position, visitedCorners = state
+        remaining = problem.allCorners & ~visitedCorners
+        if not remaining:
+            value = 0
+        else:
+            distances, tourFrom = info['cornerDistances'], info['tourFrom']
+            value = min([distances[i].get(position, 999999) + tourFrom[i, remaining & ~(1 << i)]
+                         for i in range(len(problem.corners)) if remaining & (1 << i)])
+        cache[state] = value
+    return value
 
-    # The heuristic returns the maximum distance to any unvisited corner
-    return max(distances)
+def _cornerTourTable(corners, distances, allCorners):
+    """
+    Returns a dict mapping (i, mask) to the length of the shortest path that
+    starts at corners[i] and visits every corner in mask.
+    """
+    tourFrom = {}
+    # Masks in increasing order, so smaller subsets are always solved first
+    for mask in range(allCorners + 1):
+        for i, corner in enumerate(corners):
+            if mask & (1 << i):
+                continue
+            if mask == 0:
+                tourFrom[i, mask] = 0
+                continue
+            tourFrom[i, mask] = min([distances[j].get(corner, 999999) + tourFrom[j, mask & ~(1 << j)]
+                                     for j in range(len(corners)) if mask & (1 << j)])
+    return tourFrom
 
 
 
@@ -430,6 +837,38 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+    def getStateCodec(self):
+        "A compact byte encoding of states, for externalSearch."
+        return FoodStateCodec(self.start[1])
+
+class FoodStateCodec:
+    """
+    Encodes a FoodSearchProblem state as Pacman's coordinates followed by a
+    bitmask over the dots of the starting food Grid, since food is only
+    ever eaten.
+    """
+    def __init__(self, startingFood):
+        self.width, self.height = startingFood.width, startingFood.height
+        self.dots = startingFood.asList()
+        self.maskBytes = (len(self.dots) + 7) // 8
+
+    def encode(self, state):
+        (x, y), food = state
+        mask = 0
+        for i, (fx, fy) in enumerate(self.dots):
+            if food[fx][fy]:
+                mask |= 1 << i
+        return bytes((x >> 8, x & 255, y >> 8, y & 255)) + mask.to_bytes(self.maskBytes, 'big')
+
+    def decode(self, data):
+        x, y = (data[0] << 8) | data[1], (data[2] << 8) | data[3]
+        mask = int.from_bytes(data[4:], 'big')
+        food = Grid(self.width, self.height)
+        for i, (fx, fy) in enumerate(self.dots):
+            if mask & (1 << i):
+                food[fx][fy] = True
+        return ((x, y), food)
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
@@ -444,6 +883,11 @@ def foodHeuristic(state, problem):
     state: (pacmanPosition, foodGrid), where:
         pacmanPosition: tuple (x, y) specifying Pacman's current position.
         foodGrid: a Grid representing the positions of food.
+
+    Every remaining dot must still be reached, so the largest lower bound on
+    the maze distance to any dot is admissible.  Each bound is the better of
+    the Manhattan distance and the landmark bound (see Landmarks), both of
+    which change by at most 1 per move, so the maximum stays consistent.
     """
     pacman_position, food_grid = state
     food_positions = food_grid.asList()  # Convert food grid to a list of positions
@@ -452,27 +896,41 @@ def foodHeuristic(state, problem):
     if not food_positions:
         return 0
 
-    # Compute the Manhattan distance to each food position
-    distances = [util.manhattanDistance(pacman_position, food_pos) for food_pos in food_positions]
+    # Landmark tables are built once per layout and kept in heuristicInfo
+    landmarks = problem.heuristicInfo.get('landmarks')
+    if landmarks is None:
+        landmarks = problem.heuristicInfo['landmarks'] = getLandmarks(problem.walls)
+
+    # Bound the maze distance to each food position from below
+    distances = [max(util.manhattanDistance(pacman_position, food_pos),
+                     landmarks.lowerBound(pacman_position, food_pos))
+                 for food_pos in food_positions]
 
     # Return the maximum distance to any food position
     return max(distances)
 
 
 class ClosestDotSearchAgent(SearchAgent):
-    "Search for all food using a sequence of searches"
+    """
+    Search for all food by repeatedly going to the closest dot.
+
+    The whole plan is built from one neighbor table of the layout (see
+    mazeGraph) and a set of remaining dots that shrinks as dots are eaten,
+    so no GameStates or search problems are created along the way.
+    """
     def registerInitialState(self, state):
+        graph = mazeGraph(state.getWalls())
+        remaining = set(state.getFood().asList())
+        position = state.getPacmanPosition()
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        while remaining:
+            nextPathSegment, cells = closestDotPath(position, remaining, graph)
+            if not cells:
+                break # The remaining dots cannot be reached
             self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+            # Every dot along the segment is eaten, not just the last one
+            remaining.difference_update(cells)
+            position = cells[-1]
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -481,11 +939,9 @@ class ClosestDotSearchAgent(SearchAgent):
         Returns a path (a list of actions) to the closest dot, starting from
         gameState.
         """
-        # Create an instance of AnyFoodSearchProblem
-        problem = AnyFoodSearchProblem(gameState)
-
-        # Use BFS to find the path to the closest dot
-        return search.breadthFirstSearch(problem)
+        graph = mazeGraph(gameState.getWalls())
+        food = set(gameState.getFood().asList())
+        return closestDotPath(gameState.getPacmanPosition(), food, graph)[0]
     
 
 class AnyFoodSearchProblem(PositionSearchProblem):
@@ -523,6 +979,151 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # The goal state is reached if Pacman is on a food dot
         return self.food[x][y]
 
+class CorridorGraph:
+    """
+    A reduced graph of a maze for search problems that only care about a few
+    key cells (the start, the goal, the food).
+
+    Dead ends without key cells are pruned, since no shortest path enters
+    them.  Runs of cells with exactly two open neighbors then become single
+    weighted edges between junctions, dead-end tips and key cells.  Each
+    edge stores the primitive actions and the cells it passes through, so
+    plans found on the graph can be expanded back into Directions.
+
+    Turning around inside a corridor is never useful, because corridors hold
+    no key cells.  Shortest paths on the reduced graph are therefore shortest
+    paths in the maze.
+    """
+
+    def __init__(self, walls, keyCells):
+        self.walls = walls
+        keyCells = set(keyCells)
+        graph = mazeGraph(walls)
+        degree = dict([(cell, len(moves)) for cell, moves in graph.items()])
+
+        # Prune dead ends that hold no key cell, one cell at a time
+        removed = set()
+        queue = util.Queue()
+        for cell in graph:
+            if degree[cell] <= 1 and cell not in keyCells:
+                queue.push(cell)
+        while not queue.isEmpty():
+            cell = queue.pop()
+            if cell in removed:
+                continue
+            removed.add(cell)
+            for _, neighbor in graph[cell]:
+                if neighbor not in removed:
+                    degree[neighbor] -= 1
+                    if degree[neighbor] <= 1 and neighbor not in keyCells:
+                        queue.push(neighbor)
+
+        self.nodes = set([cell for cell in graph if cell not in removed and
+                          (degree[cell] != 2 or cell in keyCells)])
+
+        # Walk every corridor leaving every node: node -> [(end, actions, cells)]
+        self.edges = {}
+        for node in self.nodes:
+            edges = []
+            for action, cell in graph[node]:
+                if cell in removed:
+                    continue
+                actions, cells, previous = [action], [cell], node
+                while cell not in self.nodes:
+                    for nextAction, nextCell in graph[cell]:
+                        if nextCell != previous and nextCell not in removed:
+                            break
+                    previous, cell = cell, nextCell
+                    actions.append(nextAction)
+                    cells.append(cell)
+                edges.append((cell, tuple(actions), tuple(cells)))
+            self.edges[node] = edges
+        self.numCells = len(graph)
+
+def expandCorridorActions(corridorActions):
+    "Flattens a plan of corridor edges (tuples of Directions) into Directions."
+    actions = []
+    for corridor in corridorActions:
+        actions.extend(corridor)
+    return actions
+
+class CorridorPositionSearchProblem(PositionSearchProblem):
+    """
+    A PositionSearchProblem over the CorridorGraph of the layout.  States are
+    still (x,y) positions, so position heuristics such as manhattanHeuristic
+    work unchanged, but each action is a whole corridor: a tuple of
+    Directions.  Use expandCorridorActions before executing or costing a
+    plan.
+    """
+
+    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+        PositionSearchProblem.__init__(self, gameState, costFn, goal, start, warn, visualize)
+        self.graph = CorridorGraph(self.walls, [self.startState, self.goal])
+
+    def getSuccessors(self, state):
+        successors = []
+        costFn = self.costFn
+        for nextState, actions, cells in self.graph.edges[state]:
+            cost = 0
+            for cell in cells:
+                cost += costFn(cell)
+            successors.append((nextState, actions, cost))
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return successors
+
+class CorridorFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem over the CorridorGraph of the layout, with every dot
+    as a key cell.  States are (pacmanPosition, foodGrid) as before, so
+    foodHeuristic works unchanged; actions are corridors (tuples of
+    Directions), to be expanded with expandCorridorActions.
+    """
+
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        position, food = self.start
+        self.graph = CorridorGraph(self.walls, [position] + food.asList())
+
+    def getSuccessors(self, state):
+        successors = []
+        self._expanded += 1 # DO NOT CHANGE
+        position, food = state
+        for (nextx, nexty), actions, cells in self.graph.edges[position]:
+            nextFood = food
+            if food[nextx][nexty]:
+                # Only corridor ends can hold food
+                nextFood = food.copy()
+                nextFood[nextx][nexty] = False
+            successors.append((((nextx, nexty), nextFood), actions, len(cells)))
+        return successors
+
+class CorridorSearchAgent(SearchAgent):
+    """
+    A SearchAgent for the Corridor*SearchProblems: it searches the reduced
+    graph and expands the resulting corridors back into Directions.
+
+    > python pacman.py -l bigMaze -p CorridorSearchAgent -a fn=astar,heuristic=manhattanHeuristic
+    > python pacman.py -l trickySearch -p CorridorSearchAgent -a fn=astar,prob=CorridorFoodSearchProblem,heuristic=foodHeuristic
+    """
+
+    def __init__(self, fn='depthFirstSearch', prob='CorridorPositionSearchProblem', heuristic='nullHeuristic'):
+        SearchAgent.__init__(self, fn, prob, heuristic)
+
+    def registerInitialState(self, state):
+        starttime = time.time()
+        problem = self.searchType(state) # Makes a new search problem
+        self.actions = expandCorridorActions(self.searchFunction(problem))
+        self.actionIndex = 0
+        totalCost = problem.getCostOfActions(self.actions)
+        print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
+        print('Search nodes expanded: %d (graph of %d nodes for %d cells)' % (problem._expanded, len(problem.graph.nodes), problem.graph.numCells))
+
 def mazeDistance(point1, point2, gameState):
     """
     Returns the maze distance between any two points, using the search functions
@@ -538,5 +1139,80 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    # Distances are symmetric, so both orders share one cache entry
+    cache = pathCache.getDistanceCache()
+    key = pathCache.makeKey('mazeDistance', pathCache.layoutDigest(walls), min(point1, point2), max(point1, point2))
+    distance = cache.get(key)
+    if distance is None:
+        prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
+        distance = len(search.bfs(prob))
+        cache.put(key, distance)
+    return distance
+
+def mazeDistances(source, walls):
+    """
+    Returns a dict mapping every position reachable from source to its maze
+    distance, found by a single breadth-first search over the walls Grid.
+    """
+    distances = {source: 0}
+    queue = util.Queue()
+    queue.push(source)
+    while not queue.isEmpty():
+        position = queue.pop()
+        distance = distances[position] + 1
+        for neighbor in Actions.getLegalNeighbors(position, walls):
+            if neighbor not in distances:
+                distances[neighbor] = distance
+                queue.push(neighbor)
+    return distances
+
+def mazeGraph(walls):
+    """
+    Returns a dict mapping every open position to a tuple of (action,
+    nextPosition) pairs, in the same North, South, East, West order used by
+    the search problems above.  Building this once per layout saves
+    recomputing direction vectors and wall lookups on every expansion.
+    """
+    graph = {}
+    for x in range(walls.width):
+        for y in range(walls.height):
+            if walls[x][y]:
+                continue
+            moves = []
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(action)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not walls[nextx][nexty]:
+                    moves.append((action, (nextx, nexty)))
+            graph[(x, y)] = tuple(moves)
+    return graph
+
+def closestDotPath(start, food, graph):
+    """
+    Breadth-first search from start over a mazeGraph to the nearest position
+    in the set food.  Returns (actions, cells), where cells are the
+    positions entered along the way; both are empty if no dot is reachable.
+
+    Goals are tested as nodes are dequeued, so ties are broken exactly as
+    breadthFirstSearch on an AnyFoodSearchProblem would break them.
+    """
+    parents = {start: None}
+    queue = util.Queue()
+    queue.push(start)
+    while not queue.isEmpty():
+        position = queue.pop()
+        if position in food:
+            actions, cells = [], []
+            while parents[position] is not None:
+                action, previous = parents[position]
+                actions.append(action)
+                cells.append(position)
+                position = previous
+            actions.reverse()
+            cells.reverse()
+            return actions, cells
+        for action, nextPosition in graph[position]:
+            if nextPosition not in parents:
+                parents[nextPosition] = (action, position)
+                queue.push(nextPosition)
+    return [], []
@@ -0,0 +1,385 @@
+# slidingpuzzle.py
+# ----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Generalized n x n sliding-tile puzzles (the 8-, 15- and 24-puzzle) together
+with additive disjoint pattern database heuristics for them.
+
+Puzzles use the same packed integer encoding as eightpuzzle.py: one field of
+cellBits bits per cell, with the index of the blank stored above the cells.
+The goal has the blank in the top left corner followed by the tiles in order.
+
+A pattern database for a group of tiles stores, for every placement of those
+tiles, the number of moves *of those tiles* needed to bring them home.  Since
+moves of other tiles are free, the databases for a partition of the tiles can
+be added together and still give a consistent heuristic.  Databases are built
+by a retrograde breadth-first search from the goal, saved as one byte per
+entry and memory-mapped when loaded, so large tables cost nothing until used.
+
+To solve a random 15-puzzle (the tables are built on first use and cached in
+the pdb/ directory):
+
+> python slidingpuzzle.py 4
+"""
+
+import mmap
+import os
+import random
+import struct
+import sys
+from collections import deque
+
+import search
+
+class SlidingPuzzle:
+    """
+    The mechanics of an n x n sliding-tile puzzle over packed states.
+
+    Puzzle states are plain integers; this class knows how to pack, unpack
+    and move them.  Moves name the direction the blank travels: 'up',
+    'down', 'left' and 'right'.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.numCells = size * size
+        self.cellBits = max(4, (self.numCells - 1).bit_length())
+        self.tileMask = (1 << self.cellBits) - 1
+        self.blankShift = self.numCells * self.cellBits
+        self.cellsMask = (1 << self.blankShift) - 1
+        self.moves = self._buildMoveTable()
+        self.goal = self.pack(list(range(self.numCells)))
+
+    def _buildMoveTable(self):
+        "For each blank index, the (move, targetIndex) pairs legal from it."
+        size = self.size
+        table = []
+        for blank in range(self.numCells):
+            row, col = divmod(blank, size)
+            moves = []
+            if row != 0:
+                moves.append(('up', blank - size))
+            if row != size - 1:
+                moves.append(('down', blank + size))
+            if col != 0:
+                moves.append(('left', blank - 1))
+            if col != size - 1:
+                moves.append(('right', blank + 1))
+            table.append(tuple(moves))
+        return tuple(table)
+
+    def pack(self, tiles):
+        """
+        Packs a list of tiles, read row by row with 0 as the blank.
+
+        >>> puzzle = SlidingPuzzle(4)
+        >>> puzzle.unpack(puzzle.pack(list(range(16)))) == list(range(16))
+        True
+        """
+        if sorted(tiles) != list(range(self.numCells)):
+            raise Exception('Not a %d-puzzle: %s' % (self.numCells - 1, str(tiles)))
+        packed = 0
+        for index, tile in enumerate(tiles):
+            packed |= tile << (self.cellBits * index)
+        return packed | (tiles.index(0) << self.blankShift)
+
+    def unpack(self, packed):
+        "Returns the list of tiles of a packed state, row by row."
+        bits, mask = self.cellBits, self.tileMask
+        return [(packed >> (bits * index)) & mask for index in range(self.numCells)]
+
+    def blankIndex(self, packed):
+        return packed >> self.blankShift
+
+    def slide(self, packed, blank, target):
+        "Slides the tile in cell 'target' into the blank cell 'blank'."
+        tile = (packed >> (self.cellBits * target)) & self.tileMask
+        packed ^= tile << (self.cellBits * target)
+        packed |= tile << (self.cellBits * blank)
+        return (packed & self.cellsMask) | (target << self.blankShift)
+
+    def legalMoves(self, packed):
+        return [move for move, _ in self.moves[packed >> self.blankShift]]
+
+    def result(self, packed, move):
+        "Returns the packed state reached by moving the blank in direction 'move'."
+        blank = packed >> self.blankShift
+        for legalMove, target in self.moves[blank]:
+            if legalMove == move:
+                return self.slide(packed, blank, target)
+        raise Exception('Illegal Move: %s' % str(move))
+
+    def isSolvable(self, tiles):
+        "Whether the goal can be reached from the given list of tiles."
+        inversions = 0
+        numbers = [tile for tile in tiles if tile != 0]
+        for i in range(len(numbers)):
+            for j in range(i + 1, len(numbers)):
+                if numbers[i] > numbers[j]:
+                    inversions += 1
+        if self.size % 2 == 1:
+            return inversions % 2 == 0
+        blankRow = tiles.index(0) // self.size
+        return (inversions + blankRow) % 2 == 0
+
+    def toString(self, packed):
+        width = len(str(self.numCells - 1))
+        horizontalLine = '-' * ((width + 3) * self.size + 1)
+        lines = [horizontalLine]
+        tiles = self.unpack(packed)
+        for row in range(self.size):
+            rowLine = '|'
+            for tile in tiles[row * self.size:(row + 1) * self.size]:
+                label = tile == 0 and ' ' or str(tile)
+                rowLine += ' ' + label.rjust(width) + ' |'
+            lines.append(rowLine)
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+def createRandomSlidingPuzzle(size, moves=100):
+    """
+      size: the side length of the board (3, 4 or 5)
+      moves: number of random moves to apply
+
+    Creates a random puzzle by applying a series of 'moves' random moves to a
+    solved puzzle.  Returns the puzzle and the packed random state.
+    """
+    puzzle = SlidingPuzzle(size)
+    state = puzzle.goal
+    for i in range(moves):
+        state = puzzle.result(state, random.choice(puzzle.legalMoves(state)))
+    return puzzle, state
+
+class SlidingPuzzleSearchProblem(search.SearchProblem):
+    """
+      A SearchProblem for an n x n sliding-tile puzzle.
+
+      Each state is a packed integer (see SlidingPuzzle) and every move costs
+      1.  patternDatabases is an optional list of PatternDatabase objects over
+      disjoint groups of tiles, used by patternDatabaseHeuristic.
+    """
+    def __init__(self, puzzle, start, patternDatabases=None):
+        self.puzzle = puzzle
+        if isinstance(start, list):
+            start = puzzle.pack(start)
+        self.startState = start
+        self.patternDatabases = patternDatabases or []
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.startState
+
+    def isGoalState(self, state):
+        return state == self.puzzle.goal
+
+    def getSuccessors(self, state):
+        self._expanded += 1
+        puzzle = self.puzzle
+        blank = state >> puzzle.blankShift
+        return [(puzzle.slide(state, blank, target), move, 1)
+                for move, target in puzzle.moves[blank]]
+
+    def getCostOfActions(self, actions):
+        state = self.startState
+        for action in actions:
+            state = self.puzzle.result(state, action)
+        return len(actions)
+
+def patternDatabaseHeuristic(state, problem):
+    """
+    The sum of the problem's disjoint pattern databases.  This is admissible
+    and consistent because each database only counts moves of its own tiles.
+    """
+    puzzle = problem.puzzle
+    positions = [0] * puzzle.numCells
+    for cell, tile in enumerate(puzzle.unpack(state)):
+        positions[tile] = cell
+    return sum([database.lookup(positions) for database in problem.patternDatabases])
+
+# Pattern databases
+
+PDB_MAGIC = b'SPDB'
+PDB_HEADER = struct.Struct('<4sBB')
+UNREACHED = 255
+
+DEFAULT_PARTITIONS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)),
+    5: ((1, 2, 5, 6), (3, 4, 8, 9), (7, 11, 12, 13), (10, 14, 15, 19),
+        (16, 17, 20, 21), (18, 22, 23, 24)),
+}
+
+def rankPlacement(cells, numCells):
+    """
+    Ranks a placement of k tiles on distinct cells as an integer in
+    [0, numCells! / (numCells - k)!).
+
+    >>> [rankPlacement(cells, 3) for cells in [(0, 1), (0, 2), (1, 0), (2, 1)]]
+    [0, 1, 2, 5]
+    """
+    index = 0
+    for i, cell in enumerate(cells):
+        smaller = 0
+        for earlier in cells[:i]:
+            if earlier < cell:
+                smaller += 1
+        index = index * (numCells - i) + cell - smaller
+    return index
+
+def unrankPlacement(index, numCells, numTiles):
+    "The inverse of rankPlacement."
+    digits = []
+    for i in range(numTiles - 1, -1, -1):
+        index, digit = divmod(index, numCells - i)
+        digits.append(digit)
+    digits.reverse()
+    free = list(range(numCells))
+    return [free.pop(digit) for digit in digits]
+
+class PatternDatabase:
+    """
+    Exact distances of an abstraction of a sliding-tile puzzle that only
+    tracks the tiles in 'tiles'.  The table holds one byte per placement of
+    those tiles, indexed by rankPlacement.
+    """
+
+    def __init__(self, size, tiles, table, mapped=None):
+        self.size = size
+        self.numCells = size * size
+        self.tiles = tuple(tiles)
+        self.table = table
+        self._mapped = mapped
+
+    def lookup(self, positions):
+        """
+        positions: a list giving the cell of every tile, indexed by tile
+        """
+        return self.table[rankPlacement([positions[tile] for tile in self.tiles], self.numCells)]
+
+    def save(self, filename):
+        f = open(filename, 'wb')
+        try:
+            f.write(PDB_HEADER.pack(PDB_MAGIC, self.size, len(self.tiles)))
+            f.write(bytes(self.tiles))
+            f.write(self.table)
+        finally:
+            f.close()
+
+    def close(self):
+        if self._mapped is not None:
+            self.table.release()
+            self._mapped.close()
+            self._mapped = None
+
+def buildPatternDatabase(puzzle, tiles):
+    """
+    Builds the pattern database for the given tiles by a retrograde search
+    from the goal.
+
+    The search runs over (placement, blank) pairs.  Moving a pattern tile
+    costs 1 and moving any other tile costs 0, so a 0-1 breadth-first search
+    with a deque gives exact distances.  The table keeps the minimum over
+    all blank positions.
+    """
+    numCells, numTiles = puzzle.numCells, len(tiles)
+    numEntries = 1
+    for i in range(numTiles):
+        numEntries *= numCells - i
+
+    table = bytearray([UNREACHED]) * numEntries
+    distances = bytearray([UNREACHED]) * (numEntries * numCells)
+    start = rankPlacement(list(tiles), numCells) * numCells
+    distances[start] = 0
+    frontier = deque([start])
+
+    while frontier:
+        code = frontier.popleft()
+        rank, blank = divmod(code, numCells)
+        distance = distances[code]
+        if distance < table[rank]:
+            table[rank] = distance
+        cells = unrankPlacement(rank, numCells, numTiles)
+        for _, target in puzzle.moves[blank]:
+            if target in cells:
+                moved = list(cells)
+                moved[cells.index(target)] = blank
+                nextCode = rankPlacement(moved, numCells) * numCells + target
+                if distance + 1 < distances[nextCode]:
+                    distances[nextCode] = distance + 1
+                    frontier.append(nextCode)
+            else:
+                nextCode = rank * numCells + target
+                if distance < distances[nextCode]:
+                    distances[nextCode] = distance
+                    frontier.appendleft(nextCode)
+
+    return PatternDatabase(puzzle.size, tiles, bytes(table))
+
+def loadPatternDatabase(filename):
+    """
+    Memory-maps a pattern database written by PatternDatabase.save.
+    """
+    f = open(filename, 'rb')
+    try:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    magic, size, numTiles = PDB_HEADER.unpack_from(mapped, 0)
+    if magic != PDB_MAGIC:
+        mapped.close()
+        raise Exception('%s is not a pattern database' % filename)
+    offset = PDB_HEADER.size
+    tiles = tuple(mapped[offset:offset + numTiles])
+    table = memoryview(mapped)[offset + numTiles:]
+    return PatternDatabase(size, tiles, table, mapped)
+
+def getPatternDatabases(puzzle, partition=None, directory='pdb'):
+    """
+    Returns the additive pattern databases for a partition of the tiles,
+    loading each one from 'directory' when it has already been built and
+    building and saving it otherwise.  Pass directory=None to keep the
+    tables in memory only.
+    """
+    if partition is None:
+        partition = DEFAULT_PARTITIONS[puzzle.size]
+    seen = set()
+    for tiles in partition:
+        if seen.intersection(tiles):
+            raise Exception('Pattern databases must use disjoint tiles: %s' % str(partition))
+        seen.update(tiles)
+
+    databases = []
+    for tiles in partition:
+        if directory is None:
+            databases.append(buildPatternDatabase(puzzle, tiles))
+            continue
+        filename = os.path.join(directory, 'puzzle%d-%s.pdb' % (puzzle.size, '-'.join([str(t) for t in tiles])))
+        if not os.path.exists(filename):
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            buildPatternDatabase(puzzle, tiles).save(filename)
+        databases.append(loadPatternDatabase(filename))
+    return databases
+
+if __name__ == '__main__':
+    size = 3
+    if len(sys.argv) > 1:
+        size = int(sys.argv[1])
+    puzzle, state = createRandomSlidingPuzzle(size, 200)
+    print('A random puzzle:')
+    print(puzzle.toString(state))
+
+    problem = SlidingPuzzleSearchProblem(puzzle, state, getPatternDatabases(puzzle))
+    path = search.aStarSearch(problem, patternDatabaseHeuristic)
+    print('A* found a path of %d moves after expanding %d nodes: %s' % (len(path), problem._expanded, str(path)))
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+import layout
+import pacman
+from game import Actions
+from hierarchicalSearch import HierarchicalPathfinder
+from searchAgents import mazeDistance, mazeDistances
+
+def makeState(rows):
+    lay = layout.Layout(rows)
+    state = pacman.GameState()
+    state.initialize(lay, 0)
+    return state
+
+def randomRows(width, height, seed, density=0.25):
+    rng = random.Random(seed)
+    rows = []
+    for y in range(height):
+        row = ''
+        for x in range(width):
+            border = x in (0, width - 1) or y in (0, height - 1)
+            row += '%' if border or rng.random() < density else ' '
+        rows.append(row)
+    # Pacman's start is needed by GameState.initialize
+    rows[1] = rows[1][:1] + 'P' + rows[1][2:]
+    return rows
+
+class TestHierarchicalPathfinder(unittest.TestCase):
+
+    def assertValidPath(self, walls, start, goal, actions):
+        position = start
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            position = (int(position[0] + dx), int(position[1] + dy))
+            self.assertFalse(walls[position[0]][position[1]])
+        self.assertEqual(position, goal)
+
+    def test_start_on_entrance_in_corridor(self):
+        rows = ['%%%%%%%%%%',
+                '%P       %',
+                '%%%%%%%%%%']
+        state = makeState(rows)
+        finder = HierarchicalPathfinder(state.getWalls(), 4)
+        self.assertIn((3, 1), finder.edges)
+        actions = finder.findPath((3, 1), (7, 1))
+        self.assertIsNotNone(actions)
+        self.assertEqual(len(actions), mazeDistance((3, 1), (7, 1), state))
+
+    def test_entrance_starts_reach_every_goal(self):
+        state = makeState(randomRows(40, 40, 1))
+        walls = state.getWalls()
+        finder = HierarchicalPathfinder(walls, 8)
+        rng = random.Random(2)
+        openCells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        starts = sorted(finder.edges)
+        for start in rng.sample(starts, min(20, len(starts))):
+            for goal in rng.sample(openCells, 10):
+                actions = finder.findPath(start, goal)
+                distances = mazeDistances(start, walls)
+                if goal not in distances:
+                    self.assertIsNone(actions)
+                    continue
+                self.assertIsNotNone(actions, 'no path from %s to %s' % (start, goal))
+                self.assertValidPath(walls, start, goal, actions)
+                self.assertGreaterEqual(len(actions), mazeDistance(start, goal, state))
+
+if __name__ == '__main__':
+    unittest.main()